@@ -0,0 +1,174 @@
+"""
+Small, fixed-size renditions of user avatars.
+
+Users upload whatever photo they have, often several megabytes, and lists
+of users would otherwise download every one of them in full. Each avatar
+is cropped to a square and saved at AVATAR_RENDITION_SIZES in WebP and
+JPEG (for browsers without WebP), under names derived from the SHA-256 of
+the uploaded file:
+
+    avatars/renditions/<hash>-128.webp
+
+The same upload always maps to the same files, so they can be cached
+forever. ``User.avatar_hash`` is filled in once every rendition exists;
+until then the ``{% avatar %}`` tag falls back to the original and asks for
+the renditions to be generated.
+
+Generation runs on a small Pillow thread pool, off the request path.
+Uploads schedule it from a post_save signal, and a render that finds no
+renditions schedules it lazily. A per-user lock (in-process, plus a cache
+key shared by every worker) makes sure each avatar is only processed once
+at a time. ``python manage.py generate_avatars`` backfills existing users.
+"""
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+RENDITION_DIR = 'avatars/renditions'
+FORMATS = {
+    # extension: (Pillow format, save options)
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+LOCK_TIMEOUT = 5 * 60
+
+_executor = None
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def sizes():
+    return sorted(getattr(settings, 'AVATAR_RENDITION_SIZES', (64, 128, 256)))
+
+
+def rendition_name(avatar_hash, size, extension):
+    return f'{RENDITION_DIR}/{avatar_hash}-{size}.{extension}'
+
+
+def pick_size(display_size, density=2):
+    """Smallest rendition that stays sharp at ``display_size`` CSS pixels"""
+    available = sizes()
+    for size in available:
+        if size >= display_size * density:
+            return size
+    return available[-1]
+
+
+def rendition_urls(user, display_size):
+    """{'webp': url, 'jpg': url} for the user's avatar, or None if not generated yet"""
+    if not user.avatar_hash:
+        return None
+    size = pick_size(display_size)
+    return {ext: default_storage.url(rendition_name(user.avatar_hash, size, ext)) for ext in FORMATS}
+
+
+# Generation
+
+def hash_file(field_file):
+    digest = hashlib.sha256()
+    field_file.open('rb')
+    try:
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()[:32]
+
+
+def load_image(field_file, largest):
+    from PIL import Image, ImageOps
+
+    field_file.open('rb')
+    try:
+        image = Image.open(field_file)
+        # JPEGs can be decoded at 1/2..1/8 scale, much faster for big photos
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    finally:
+        field_file.close()
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render(image, size, extension):
+    from PIL import Image, ImageOps
+
+    square = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    pillow_format, options = FORMATS[extension]
+    square.save(out, pillow_format, **options)
+    return out.getvalue()
+
+
+def generate(user):
+    """Write any missing renditions of the user's avatar; returns its hash"""
+    avatar_hash = hash_file(user.avatar)
+    wanted = [(size, ext) for size in sizes() for ext in FORMATS
+              if not default_storage.exists(rendition_name(avatar_hash, size, ext))]
+    if wanted:
+        image = load_image(user.avatar, max(size for size, _ in wanted))
+        for size, ext in wanted:
+            default_storage.save(rendition_name(avatar_hash, size, ext), ContentFile(render(image, size, ext)))
+    return avatar_hash
+
+
+def process_user(user_id):
+    from .models import User
+
+    user = User.objects.filter(pk=user_id).only('avatar', 'avatar_hash').first()
+    if user is None or not user.avatar:
+        return None
+    avatar_hash = generate(user)
+    # Only record the hash if the avatar wasn't replaced in the meantime
+    User.objects.filter(pk=user_id, avatar=user.avatar.name).update(avatar_hash=avatar_hash)
+    return avatar_hash
+
+
+# Scheduling
+
+def lock_key(user_id):
+    return f'avatars:lock:{user_id}'
+
+
+def schedule(user_id):
+    """Generate the user's renditions on the pool, unless already under way"""
+    global _executor
+    with _pending_lock:
+        if user_id in _pending or not cache.add(lock_key(user_id), 1, LOCK_TIMEOUT):
+            return False
+        _pending.add(user_id)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'AVATAR_RENDITION_WORKERS', 2),
+                thread_name_prefix='avatars',
+            )
+    _executor.submit(_process_in_background, user_id)
+    return True
+
+
+def _process_in_background(user_id):
+    try:
+        process_user(user_id)
+        cache.delete(lock_key(user_id))
+    except Exception as e:
+        # The lock is left to expire, so a broken upload isn't retried on every render
+        logger.error(f"Avatar renditions failed for user {user_id}: {str(e)}")
+    finally:
+        with _pending_lock:
+            _pending.discard(user_id)
+        close_old_connections()
@@ -1,6 +1,5 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
 
 User = get_user_model()
 
@@ -15,15 +14,15 @@ class EmailOrUsernameModelBackend(ModelBackend):
         if username is None or password is None:
             return
         
-        try:
-            # Try to find user by username or email
-            user = User.objects.get(
-                Q(username__iexact=username) | Q(email__iexact=username)
-            )
-        except User.DoesNotExist:
+        # Two indexed probes instead of an OR of case-insensitive matches,
+        # which no index can serve. Usernames take precedence over emails.
+        user = User.objects.get_by_username_iexact(username)
+        if user is None:
+            user = User.objects.get_by_email_iexact(username)
+        
+        if user is None:
             # Run the default password hasher once to reduce the timing
             # difference between an existing and a nonexistent user
             User().set_password(password)
-        else:
-            if user.check_password(password) and self.user_can_authenticate(user):
-                return user
\ No newline at end of file
+        elif user.check_password(password) and self.user_can_authenticate(user):
+            return user
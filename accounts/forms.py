@@ -62,7 +62,8 @@ class PasswordResetRequestForm(forms.Form):
 
     def clean_email(self):
         email = self.cleaned_data['email']
-        if not User.objects.filter(email=email).exists():
+        self.user = User.objects.get_by_email_iexact(email)
+        if self.user is None:
             raise forms.ValidationError("No account found with this email address.")
         return email
 
@@ -112,7 +113,8 @@ class UsernameRecoveryRequestForm(forms.Form):
 
     def clean_email(self):
         email = self.cleaned_data['email']
-        if not User.objects.filter(email=email).exists():
+        self.user = User.objects.get_by_email_iexact(email)
+        if self.user is None:
             raise forms.ValidationError("No account found with this email address.")
         return email
 
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from accounts import avatars
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Generate the avatar renditions of users that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Regenerate every avatar, e.g. after changing AVATAR_RENDITION_SIZES')
+        parser.add_argument('--workers', type=int, default=4, help='Threads resizing images')
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(avatar='').exclude(avatar__isnull=True)
+        if not options['all']:
+            users = users.filter(avatar_hash='')
+        user_ids = list(users.order_by('id').values_list('id', flat=True))
+        done = failed = 0
+
+        def process(user_id):
+            try:
+                avatars.process_user(user_id)
+                return None
+            except Exception as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for user_id, error in zip(user_ids, pool.map(process, user_ids)):
+                done += 1
+                if error:
+                    failed += 1
+                    self.stderr.write(f'User {user_id}: {error}')
+                if done % 100 == 0:
+                    self.stdout.write(f'{done}/{len(user_ids)} avatars processed')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {done} avatars ({failed} failed).'
+        ))
@@ -0,0 +1,41 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in small batches to keep database write locks short'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of sessions deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help='Seconds to sleep between batches so requests can take the write lock')
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            # Cache and signed-cookie sessions expire on their own
+            self.stdout.write(f'{settings.SESSION_ENGINE} has no session table to purge.')
+            return
+        session_model = store.get_model_class()
+
+        batch_size = options['batch_size']
+        now = timezone.now()
+        total = 0
+        while True:
+            keys = list(
+                session_model.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            total += session_model.objects.filter(session_key__in=keys).delete()[0]
+            if len(keys) < batch_size:
+                break
+            time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {total} expired sessions.'))
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Recompute every user\'s total_songs_uploaded and total_votes_received counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of users written per UPDATE')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted counters without writing them')
+
+    def handle(self, *args, **options):
+        # One grouped query over users, songs and votes
+        actual = (User.objects
+                  .annotate(song_total=Count('songs', distinct=True),
+                            vote_total=Count('songs__votes'))
+                  .values_list('pk', 'total_songs_uploaded', 'total_votes_received',
+                               'song_total', 'vote_total'))
+
+        drifted = [
+            User(pk=pk, total_songs_uploaded=song_total, total_votes_received=vote_total)
+            for pk, songs, votes, song_total, vote_total in actual.iterator(chunk_size=2000)
+            if (songs, votes) != (song_total, vote_total)
+        ]
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                User.objects.bulk_update(
+                    drifted, ['total_songs_uploaded', 'total_votes_received'],
+                    batch_size=options['batch_size']
+                )
+
+        verb = 'Would fix' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} counters for {len(drifted)} users.'))
@@ -1,7 +1,37 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
+class AccountUserManager(UserManager):
+    """
+    Case-insensitive lookups that can use the Lower() expression indexes.
+    
+    The value is lowered by the database too, never by Python: SQLite's
+    LOWER() folds only ASCII letters while str.lower() folds everything, so
+    'Ärger'.lower() would never equal LOWER('Ärger') in an index.
+    """
+    
+    def filter_username_iexact(self, username):
+        return self.alias(username_lower=Lower('username')).filter(username_lower=Lower(Value(username)))
+    
+    def filter_email_iexact(self, email):
+        return self.alias(email_lower=Lower('email')).filter(email_lower=Lower(Value(email)))
+    
+    def get_by_username_iexact(self, username):
+        """Return the user with this username in any case, preferring an exact match"""
+        # Sliced without ORDER BY so the planner probes the index
+        matches = list(self.filter_username_iexact(username)[:2])
+        if len(matches) > 1:
+            matches = [user for user in matches if user.username == username]
+        return matches[0] if len(matches) == 1 else None
+    
+    def get_by_email_iexact(self, email):
+        """Return the only user with this email, or None if there are none or several"""
+        matches = list(self.filter_email_iexact(email)[:2])
+        return matches[0] if len(matches) == 1 else None
+
 class User(AbstractUser):
     class Gender(models.TextChoices):
         MALE = 'M', _('Male')
@@ -23,6 +53,8 @@ class User(AbstractUser):
     # Profile enhancements
     bio = models.TextField(max_length=500, blank=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    # SHA-256 prefix of the avatar file once its renditions exist (see accounts/avatars.py)
+    avatar_hash = models.CharField(max_length=32, blank=True, editable=False)
     website = models.URLField(blank=True)
     social_media = models.CharField(max_length=100, blank=True, help_text="Instagram/Twitter handle")
     is_verified = models.BooleanField(default=False)
@@ -31,6 +63,18 @@ class User(AbstractUser):
     total_votes_received = models.PositiveIntegerField(default=0)
     total_songs_uploaded = models.PositiveIntegerField(default=0)
     
+    objects = AccountUserManager()
+    
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Serve the case-insensitive login and recovery lookups; a plain
+            # index can't be used for iexact/UPPER() comparisons.
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            # Leaderboard top artists
+            models.Index(fields=['-total_votes_received'], name='user_votes_received_idx'),
+        ]
+    
     def __str__(self):
         return self.username
     
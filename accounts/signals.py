@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from . import avatars
+from .models import User
+
+
+# Avatar renditions
+
+@receiver(post_init, sender=User)
+def remember_loaded_avatar(sender, instance, **kwargs):
+    # Read __dict__ directly so a deferred field doesn't cost a query
+    instance._loaded_avatar = instance.__dict__.get('avatar') or ''
+
+@receiver(post_save, sender=User)
+def schedule_avatar_renditions(sender, instance, update_fields=None, **kwargs):
+    """Render a new avatar's thumbnails once the upload has committed"""
+    if update_fields is not None and 'avatar' not in update_fields:
+        return
+    name = instance.avatar.name or ''
+    if name == instance._loaded_avatar:
+        return
+    instance._loaded_avatar = name
+    if instance.avatar_hash:
+        # The renditions belong to the old file
+        instance.avatar_hash = ''
+        User.objects.filter(pk=instance.pk).update(avatar_hash='')
+    if name and getattr(settings, 'AVATAR_RENDITIONS_ON_SAVE', True):
+        transaction.on_commit(lambda: avatars.schedule(instance.pk))
@@ -0,0 +1,34 @@
+"""
+Avatar images served from their renditions, see accounts.avatars.
+
+    {% load avatars %}
+    {% if user.avatar %}{% avatar user 60 'user-avatar' %}{% endif %}
+
+The size is the displayed size in CSS pixels; the tag picks the smallest
+rendition that is sharp on a 2x screen.
+"""
+from django import template
+from django.utils.html import format_html
+
+from accounts import avatars
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar(user, size, css_class=''):
+    if not user.avatar:
+        return ''
+    urls = avatars.rendition_urls(user, size)
+    if urls is None:
+        # Not generated yet: show the original this once
+        avatars.schedule(user.pk)
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" width="{}" height="{}" loading="lazy" decoding="async">',
+            user.avatar.url, user.username, css_class, size, size,
+        )
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp">'
+        '<img src="{}" alt="{}" class="{}" width="{}" height="{}" loading="lazy" decoding="async"></picture>',
+        urls['webp'], urls['jpg'], user.username, css_class, size, size,
+    )
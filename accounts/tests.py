@@ -0,0 +1,32 @@
+from django.contrib.auth import authenticate, get_user_model
+from django.test import TestCase
+
+User = get_user_model()
+
+
+class CaseInsensitiveLoginTests(TestCase):
+    """Logins match usernames and emails in any case, through the Lower() indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ascii_user = User.objects.create_user('Alice', 'Alice@Example.com', 'pw')
+        cls.unicode_user = User.objects.create_user('ÄRGER', 'Łukasz@Example.com', 'pw')
+
+    def test_username_in_any_case(self):
+        self.assertEqual(authenticate(username='aLICE', password='pw'), self.ascii_user)
+
+    def test_email_in_any_case(self):
+        self.assertEqual(authenticate(username='alice@example.COM', password='pw'), self.ascii_user)
+
+    def test_non_ascii_username(self):
+        for login in ('ÄRGER', 'Ärger', 'ÄrGeR'):
+            with self.subTest(login=login):
+                self.assertEqual(authenticate(username=login, password='pw'), self.unicode_user)
+
+    def test_non_ascii_email(self):
+        for login in ('Łukasz@Example.com', 'Łukasz@EXAMPLE.com'):
+            with self.subTest(login=login):
+                self.assertEqual(authenticate(username=login, password='pw'), self.unicode_user)
+
+    def test_unknown_login(self):
+        self.assertIsNone(authenticate(username='nobody', password='pw'))
@@ -3,14 +3,18 @@ from django.contrib.auth import login, authenticate, get_user_model
 from django.contrib.auth.views import LoginView, LogoutView
 from django.urls import reverse_lazy
 from django.contrib import messages
+from django.utils.decorators import method_decorator
 from .forms import (
     SignUpForm, PasswordResetRequestForm, PasswordResetVerifyForm, CustomSetPasswordForm,
     UsernameRecoveryRequestForm, UsernameRecoveryVerifyForm
 )
 from email_verification.services import EmailVerificationService
+from email_verification import session_state
+from ai_contest.ratelimit import ratelimit
 
 User = get_user_model()
 
+@method_decorator(ratelimit('login', rate='10/5m', keys=('ip', 'post:username')), name='dispatch')
 class CustomLoginView(LoginView):
     template_name = 'accounts/login.html'
     redirect_authenticated_user = True
@@ -27,10 +31,10 @@ class CustomLoginView(LoginView):
                 )
                 
                 # Set session data for verification
-                self.request.session['pending_verification'] = True
-                self.request.session['pending_verification_user_id'] = user.id
-                self.request.session['pending_verification_email'] = user.email
-                self.request.session['verification_type'] = 'login'
+                session_state.start_flow(
+                    self.request.session, session_state.EMAIL_VERIFICATION,
+                    user_id=user.id, email=user.email, verification_type='login'
+                )
                 
                 messages.info(self.request, 'Please verify your email to complete login.')
                 return redirect('email_verification:verify_email')
@@ -45,6 +49,7 @@ class CustomLoginView(LoginView):
 class CustomLogoutView(LogoutView):
     next_page = reverse_lazy('contest:home')
 
+@ratelimit('signup', rate='5/h', keys=('ip',))
 def signup_view(request):
     if request.method == 'POST':
         form = SignUpForm(request.POST)
@@ -60,10 +65,10 @@ def signup_view(request):
                 )
                 
                 # Set session data for verification
-                request.session['pending_verification'] = True
-                request.session['pending_verification_user_id'] = user.id
-                request.session['pending_verification_email'] = user.email
-                request.session['verification_type'] = 'registration'
+                session_state.start_flow(
+                    request.session, session_state.EMAIL_VERIFICATION,
+                    user_id=user.id, email=user.email, verification_type='registration'
+                )
                 
                 messages.success(request, 'Registration successful! Please check your email for a verification code.')
                 return redirect('email_verification:verify_email')
@@ -78,13 +83,14 @@ def signup_view(request):
     return render(request, 'accounts/signup.html', {'form': form})
 
 
+@ratelimit('password_reset', rate='5/15m', keys=('ip', 'post:email'))
 def password_reset_request_view(request):
     """Request password reset by email"""
     if request.method == 'POST':
         form = PasswordResetRequestForm(request.POST)
         if form.is_valid():
-            email = form.cleaned_data['email']
-            user = User.objects.get(email=email)
+            user = form.user
+            email = user.email
             
             try:
                 # Send verification code for password reset
@@ -93,9 +99,10 @@ def password_reset_request_view(request):
                 )
                 
                 # Set session data for verification
-                request.session['pending_password_reset'] = True
-                request.session['password_reset_user_id'] = user.id
-                request.session['password_reset_email'] = email
+                session_state.start_flow(
+                    request.session, session_state.PASSWORD_RESET,
+                    user_id=user.id, email=email, verified=False
+                )
                 
                 messages.success(request, 'Password reset code sent to your email.')
                 return redirect('accounts:password_reset_verify')
@@ -111,12 +118,13 @@ def password_reset_request_view(request):
 
 def password_reset_verify_view(request):
     """Verify password reset code"""
-    if not request.session.get('pending_password_reset'):
+    flow = session_state.get_flow(request.session, session_state.PASSWORD_RESET)
+    if not flow:
         messages.error(request, 'No password reset request found.')
         return redirect('accounts:password_reset_request')
     
-    user_id = request.session.get('password_reset_user_id')
-    email = request.session.get('password_reset_email')
+    user_id = flow.get('user_id')
+    email = flow.get('email')
     user = get_object_or_404(User, id=user_id, email=email)
     
     if request.method == 'POST':
@@ -131,7 +139,9 @@ def password_reset_verify_view(request):
             
             if success:
                 # Set session for password reset
-                request.session['password_reset_verified'] = True
+                session_state.update_flow(
+                    request.session, session_state.PASSWORD_RESET, verified=True
+                )
                 messages.success(request, 'Code verified! Please set your new password.')
                 return redirect('accounts:password_reset_confirm')
             else:
@@ -148,11 +158,12 @@ def password_reset_verify_view(request):
 
 def password_reset_confirm_view(request):
     """Set new password after verification"""
-    if not request.session.get('password_reset_verified'):
+    flow = session_state.get_flow(request.session, session_state.PASSWORD_RESET)
+    if not flow.get('verified'):
         messages.error(request, 'Please verify your email first.')
         return redirect('accounts:password_reset_request')
     
-    user_id = request.session.get('password_reset_user_id')
+    user_id = flow.get('user_id')
     user = get_object_or_404(User, id=user_id)
     
     if request.method == 'POST':
@@ -161,10 +172,7 @@ def password_reset_confirm_view(request):
             form.save()
             
             # Clear session data
-            request.session.pop('pending_password_reset', None)
-            request.session.pop('password_reset_user_id', None)
-            request.session.pop('password_reset_email', None)
-            request.session.pop('password_reset_verified', None)
+            session_state.clear_flow(request.session, session_state.PASSWORD_RESET)
             
             messages.success(request, 'Password reset successfully! You can now login with your new password.')
             return redirect('accounts:login')
@@ -174,13 +182,14 @@ def password_reset_confirm_view(request):
     return render(request, 'accounts/password_reset_confirm.html', {'form': form})
 
 
+@ratelimit('username_recovery', rate='5/15m', keys=('ip', 'post:email'))
 def username_recovery_request_view(request):
     """Request username recovery by email"""
     if request.method == 'POST':
         form = UsernameRecoveryRequestForm(request.POST)
         if form.is_valid():
-            email = form.cleaned_data['email']
-            user = User.objects.get(email=email)
+            user = form.user
+            email = user.email
             
             try:
                 # Send verification code for username recovery
@@ -189,9 +198,10 @@ def username_recovery_request_view(request):
                 )
                 
                 # Set session data for verification
-                request.session['pending_username_recovery'] = True
-                request.session['username_recovery_user_id'] = user.id
-                request.session['username_recovery_email'] = email
+                session_state.start_flow(
+                    request.session, session_state.USERNAME_RECOVERY,
+                    user_id=user.id, email=email
+                )
                 
                 messages.success(request, 'Username recovery code sent to your email.')
                 return redirect('accounts:username_recovery_verify')
@@ -207,12 +217,13 @@ def username_recovery_request_view(request):
 
 def username_recovery_verify_view(request):
     """Verify username recovery code and show username"""
-    if not request.session.get('pending_username_recovery'):
+    flow = session_state.get_flow(request.session, session_state.USERNAME_RECOVERY)
+    if not flow:
         messages.error(request, 'No username recovery request found.')
         return redirect('accounts:username_recovery_request')
     
-    user_id = request.session.get('username_recovery_user_id')
-    email = request.session.get('username_recovery_email')
+    user_id = flow.get('user_id')
+    email = flow.get('email')
     user = get_object_or_404(User, id=user_id, email=email)
     
     if request.method == 'POST':
@@ -227,9 +238,7 @@ def username_recovery_verify_view(request):
             
             if success:
                 # Clear session data
-                request.session.pop('pending_username_recovery', None)
-                request.session.pop('username_recovery_user_id', None)
-                request.session.pop('username_recovery_email', None)
+                session_state.clear_flow(request.session, session_state.USERNAME_RECOVERY)
                 
                 # Show username
                 messages.success(request, f'Your username is: {user.username}')
@@ -0,0 +1,131 @@
+"""
+Cache-backed sliding-window rate limiting.
+
+    @ratelimit('login', rate='10/5m', keys=['ip', 'post:username'])
+    def my_view(request): ...
+
+Each key function identifies a client (IP, user, submitted email...) and is
+limited independently. Counting uses the sliding-window approximation: one
+counter per fixed window plus the previous window's counter weighted by how
+much of it still overlaps the sliding window. That is two cache reads and one
+atomic increment per check, with no database access, so a flood of attempts
+is turned away before it reaches the database or the mail server.
+"""
+import hashlib
+import math
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+RATE_PATTERN = re.compile(r'^(\d+)/(\d*)([smhd])$')
+UNIT_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Parse '5/m' or '3/10m' into (limit, window_seconds)"""
+    match = RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate: {rate!r}")
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * UNIT_SECONDS[unit]
+
+
+def get_client_ip(request):
+    if getattr(settings, 'RATELIMIT_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def resolve_key(request, key):
+    """Turn a key spec into an identity string, or None to skip this key"""
+    if callable(key):
+        return key(request)
+    if key == 'ip':
+        return get_client_ip(request)
+    if key == 'user':
+        user = getattr(request, 'user', None)
+        return str(user.pk) if user is not None and user.is_authenticated else None
+    if key.startswith('post:'):
+        value = request.POST.get(key[5:], '').strip().lower()
+        return value or None
+    raise ValueError(f"Unknown rate limit key: {key!r}")
+
+
+def hit(scope, identity, limit, window):
+    """
+    Record one request for ``identity`` and return seconds to wait before
+    retrying, or 0 if the request is within the limit.
+    """
+    cache = caches[getattr(settings, 'RATELIMIT_CACHE_ALIAS', 'default')]
+    digest = hashlib.sha1(identity.encode('utf-8')).hexdigest()
+    now = time.time()
+    current_window = int(now // window)
+    current_key = f'rl:{scope}:{digest}:{current_window}'
+    previous_key = f'rl:{scope}:{digest}:{current_window - 1}'
+
+    counts = cache.get_many([current_key, previous_key])
+    current = counts.get(current_key, 0)
+    previous = counts.get(previous_key, 0)
+    elapsed = (now % window) / window
+
+    if previous * (1 - elapsed) + current >= limit:
+        if current >= limit:
+            # Nothing frees up until this window rolls over
+            wait = window * (1 - elapsed)
+        else:
+            # Wait until enough of the previous window has slid out
+            wait = window * (1 - (limit - current) / previous - elapsed)
+        return max(1, math.ceil(wait))
+
+    # add() + incr() keeps the increment atomic on Redis
+    if not cache.add(current_key, 1, timeout=window * 2):
+        try:
+            cache.incr(current_key)
+        except ValueError:
+            cache.set(current_key, 1, timeout=window * 2)
+    return 0
+
+
+def ratelimited_response(request, retry_after):
+    message = 'Too many requests. Please wait before trying again.'
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest' \
+            or 'application/json' in request.headers.get('accept', '') \
+            or request.content_type == 'application/json':
+        response = JsonResponse({'success': False, 'message': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def ratelimit(scope, rate, keys=('ip',), methods=('POST',)):
+    """
+    Limit a view to ``rate`` requests per identity for each of ``keys``.
+
+    ``keys`` entries may be 'ip', 'user', 'post:<field>' or a callable that
+    takes the request and returns an identity string (or None to skip).
+    Only requests whose method is in ``methods`` are counted.
+    """
+    limit, window = parse_rate(rate)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if getattr(settings, 'RATELIMIT_ENABLED', True) and request.method in methods:
+                for key in keys:
+                    identity = resolve_key(request, key)
+                    if identity is None:
+                        continue
+                    retry_after = hit(f'{scope}:{key if isinstance(key, str) else key.__name__}',
+                                      identity, limit, window)
+                    if retry_after:
+                        return ratelimited_response(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -33,6 +33,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'contest.middleware.CompressionMiddleware',
+    'contest.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -41,6 +43,14 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# ASGI profile: route the public read views to contest.async_views.
+# ai_contest.asgi turns this on. WhiteNoise is WSGI-only and would push every
+# request back onto a thread, so static files must be served by the front-end
+# web server in this profile.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+if ASYNC_VIEWS:
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'ai_contest.urls'
 
 TEMPLATES = [
@@ -54,6 +64,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'contest.context_processors.user_votes',
+                'contest.context_processors.live_updates',
             ],
         },
     },
@@ -69,6 +81,109 @@ DATABASES = {
     }
 }
 
+# Applied to every new SQLite connection (see contest/signals.py). WAL lets
+# readers carry on while a vote is being written; set SQLITE_JOURNAL_MODE=delete
+# if the database lives on a network filesystem.
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='wal'),
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'temp_store': 'memory',
+    'cache_size': -16000,  # KiB
+}
+
+# Cache
+# Set CACHE_LOCATION (e.g. redis://127.0.0.1:6379/1) in production so every
+# worker shares the page cache and its invalidations.
+CACHE_LOCATION = config('CACHE_LOCATION', default='')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_LOCATION,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Anonymous full-page cache (see contest/page_cache.py)
+PAGE_CACHE_ALIAS = 'default'
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=300, cast=int)
+# Rendered song cards (see contest/fragment_cache.py); bounds how stale view counts get
+SONG_CARD_CACHE_TIMEOUT = config('SONG_CARD_CACHE_TIMEOUT', default=300, cast=int)
+# Current phase and home page totals (see contest/site_stats.py)
+SITE_STATS_CACHE_TIMEOUT = 60
+
+# Unique listeners (see contest/unique_viewers.py): each worker writes its
+# HyperLogLog sketches to the database this often, in seconds
+UNIQUE_VIEWERS_FLUSH_INTERVAL = 60
+
+# Comments per page on song pages and the comment feed (see contest/comment_feed.py)
+COMMENT_PAGE_SIZE = 10
+
+# Warm up each WSGI worker before it serves requests (see ai_contest/warmup.py)
+WSGI_WARMUP = config('WSGI_WARMUP', default=True, cast=bool)
+
+# Sessions
+# SESSION_PROFILE picks the session engine:
+#   db             - every request reads django_session (Django default)
+#   cached_db      - reads come from the cache, writes go through to the DB
+#   cache          - cache only; sessions are lost if the cache is flushed
+#   signed_cookies - no server-side storage; only suitable for small payloads
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_PROFILE = config('SESSION_PROFILE', default='cached_db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]
+SESSION_SAVE_EVERY_REQUEST = False
+
+# Live SSE feeds (see contest/live.py). 'local' only reaches clients connected
+# to the same process; 'cache' shares events through CACHES between workers.
+LIVE_BROKER = config('LIVE_BROKER', default='cache' if CACHE_LOCATION else 'local')
+LIVE_MAX_PENDING_EVENTS = 50
+
+# Rate limiting for login, signup, recovery and voting (see ai_contest/ratelimit.py)
+RATELIMIT_ENABLED = config('RATELIMIT_ENABLED', default=True, cast=bool)
+RATELIMIT_CACHE_ALIAS = 'default'
+# Only enable behind a proxy that overwrites X-Forwarded-For
+RATELIMIT_TRUST_X_FORWARDED_FOR = config('RATELIMIT_TRUST_X_FORWARDED_FOR', default=False, cast=bool)
+
+# Ranking: how many votes' worth of weight the contest-wide mean rating
+# carries in each song's Bayesian ranking score
+RANKING_PRIOR_VOTES = config('RANKING_PRIOR_VOTES', default=5, cast=int)
+
+# Trending: activity counts half as much after each half-life; a vote is
+# worth TRENDING_VOTE_WEIGHT views
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=24, cast=float)
+TRENDING_VIEW_WEIGHT = 1.0
+TRENDING_VOTE_WEIGHT = config('TRENDING_VOTE_WEIGHT', default=5.0, cast=float)
+
+# Recommendations: similar songs kept per song by refresh_recommendations
+RECOMMENDATION_NEIGHBORS = config('RECOMMENDATION_NEIGHBORS', default=6, cast=int)
+
+# Response compression (contest.middleware.CompressionMiddleware): bodies
+# shorter than this are sent as-is
+COMPRESSION_MIN_LENGTH = config('COMPRESSION_MIN_LENGTH', default=1024, cast=int)
+
+# Lyrics near-duplicate detection (contest.lyrics): uploads are analyzed on a
+# background thread; pairs sharing at least this estimated fraction of their
+# word 3-grams are flagged for review
+LYRICS_ANALYSIS_ON_SAVE = config('LYRICS_ANALYSIS_ON_SAVE', default=True, cast=bool)
+LYRICS_DUPLICATE_THRESHOLD = config('LYRICS_DUPLICATE_THRESHOLD', default=0.5, cast=float)
+
+# Avatar renditions (see accounts/avatars.py): square WebP and JPEG copies at
+# these pixel sizes, generated on a background thread pool
+AVATAR_RENDITION_SIZES = (64, 128, 256)
+AVATAR_RENDITION_WORKERS = 2
+AVATAR_RENDITIONS_ON_SAVE = True
+
 # Password validation - Relaxed for user convenience
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -92,7 +207,8 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Minifies static/css and static/js, then hashes and gzips/brotlis everything
+STATICFILES_STORAGE = 'ai_contest.storage.MinifiedManifestStaticFilesStorage'
 
 # Media files
 MEDIA_URL = '/media/'
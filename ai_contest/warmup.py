@@ -0,0 +1,106 @@
+"""
+Warm up a freshly spawned worker before it takes traffic.
+
+Passenger recycles processes often, and without this the first request
+after each spawn pays for everything Django does lazily: building the URL
+resolver, compiling templates, opening the database, loading translation
+catalogs and password hashers, and filling our own caches. ``warm_up()``
+does all of that up front; ``ai_contest.wsgi`` calls it when WSGI_WARMUP is
+on. A step that fails is logged and skipped, never fatal.
+
+    python benchmarks/startup.py   # import-time report and first-request timings
+"""
+import logging
+import os
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def warm_urls():
+    from django.urls import get_resolver
+    # Imports every view module and builds the reverse lookup tables
+    resolver = get_resolver()
+    resolver.reverse_dict
+    for namespace in resolver.namespace_dict:
+        resolver.namespace_dict[namespace][1].reverse_dict
+    return len(resolver.reverse_dict)
+
+
+def template_names(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if not name.startswith('.'):
+                yield os.path.relpath(os.path.join(root, name), directory).replace(os.sep, '/')
+
+
+def warm_templates():
+    """Compile every template into the cached loader"""
+    from django.template import TemplateSyntaxError, engines
+    from django.template.backends.django import DjangoTemplates
+
+    compiled = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        engine = backend.engine
+        for loader in engine.template_loaders:
+            for source in getattr(loader, 'loaders', [loader]):
+                for directory in source.get_dirs():
+                    for name in template_names(str(directory)):
+                        try:
+                            engine.get_template(name)
+                        except (TemplateSyntaxError, UnicodeDecodeError) as e:
+                            logger.debug(f"Skipped template {name}: {e}")
+                        else:
+                            compiled += 1
+    return compiled
+
+
+def warm_database():
+    """Connect every database; connection_created applies the SQLite pragmas"""
+    from django.db import connections
+    for alias in connections:
+        connections[alias].ensure_connection()
+    return len(connections.all())
+
+
+def warm_runtime():
+    from django.contrib.auth.hashers import get_hashers
+    from django.utils import translation
+    get_hashers()
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.gettext('Password')
+    translation.deactivate()
+
+
+def warm_caches():
+    from contest import ranking, site_stats
+    site_stats.prime()
+    ranking.get_prior_mean()
+
+
+STEPS = [
+    ('urls', warm_urls),
+    ('templates', warm_templates),
+    ('database', warm_database),
+    ('runtime', warm_runtime),
+    ('caches', warm_caches),
+]
+
+
+def warm_up():
+    """Run every step; returns {step: seconds}"""
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.error(f"Warmup step {name} failed: {str(e)}")
+        timings[name] = time.perf_counter() - started
+    logger.info('Warmup done: ' + ', '.join(f'{name} {seconds * 1000:.0f}ms' for name, seconds in timings.items()))
+    return timings
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_contest.settings')
 
 application = get_wsgi_application()
+
+# Pay the lazy first-request costs now, before the worker takes traffic
+if getattr(settings, 'WSGI_WARMUP', False):
+    from ai_contest.warmup import warm_up
+    warm_up()
@@ -0,0 +1,137 @@
+"""
+Measure what CompressionMiddleware saves on browse_songs and song_detail.
+
+Builds a throwaway SQLite database with ``--songs`` songs, then requests each
+page through the WSGI handler with compression off (the middleware removed),
+gzip and, when the ``brotli`` package is installed, brotli. For each it
+prints
+
+* the bytes sent,
+* time to first byte: until the WSGI app hands over the first body chunk,
+* the estimated time to transfer the body at ``--mbps``.
+
+Pass ``--logged-in`` to request as a signed-in user, whose pages carry a
+CSRF token and therefore get gzip with BREACH padding.
+
+    python benchmarks/compression.py --songs 500 --requests 50 --mbps 2
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_contest.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+COMPRESSION_MIDDLEWARE = 'contest.middleware.CompressionMiddleware'
+
+
+def setup_database(path):
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}
+    # Measure rendering, not the page cache; no collected static files needed
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    settings.STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+    settings.ALLOWED_HOSTS = ['testserver']
+    settings.MIGRATION_MODULES = {app: None for app in (
+        'admin', 'auth', 'contenttypes', 'sessions', 'contest', 'accounts', 'email_verification')}
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def populate(count):
+    from accounts.models import User
+    from contest.models import Song
+
+    users = User.objects.bulk_create([
+        User(username=f'artist{i}', email=f'artist{i}@example.com', password='!',
+             first_name=f'First{i}', last_name=f'Last{i}')
+        for i in range(max(count // 5, 1))
+    ])
+    Song.objects.bulk_create([
+        Song(user=users[i % len(users)], title=f'Song number {i}', language='urdu', genre='pop',
+             description='A song about peace and hope for humanity. ' * 5, ai_tool_used='Suno',
+             audio_file=f'songs/audio/{i}.mp3', lyrics_file=f'songs/lyrics/{i}.txt',
+             vote_count=i % 7, average_rating=(i % 5) + 0.5)
+        for i in range(count)
+    ])
+    return users[0], Song.objects.order_by('id').first()
+
+
+def handler_for(middleware):
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+
+    settings.MIDDLEWARE = middleware
+    return WSGIHandler()
+
+
+def request(handler, path, accept_encoding, cookie):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'HTTP_HOST': 'testserver',
+        'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(b''), 'wsgi.errors': sys.stderr,
+        'HTTP_ACCEPT_ENCODING': accept_encoding, 'HTTP_COOKIE': cookie,
+    }
+    statuses = []
+    started = time.perf_counter()
+    body = iter(handler(environ, lambda status, headers: statuses.append(status)))
+    first = next(body, b'')
+    ttfb = time.perf_counter() - started
+    size = len(first) + sum(len(chunk) for chunk in body)
+    if not statuses[0].startswith('200'):
+        raise RuntimeError(f'{path} returned {statuses[0]}')
+    return size, ttfb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--songs', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--mbps', type=float, default=2.0, help='Link speed for the transfer estimate')
+    parser.add_argument('--logged-in', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_database(os.path.join(directory, 'compression.sqlite3'))
+        from django.conf import settings
+        from django.test import Client
+        from contest import compression
+
+        user, song = populate(args.songs)
+        cookie = ''
+        if args.logged_in:
+            client = Client()
+            client.force_login(user)
+            client.get('/')  # Sets the CSRF cookie
+            cookie = '; '.join(f'{key}={morsel.value}' for key, morsel in client.cookies.items())
+
+        middleware = list(settings.MIDDLEWARE)
+        variants = [('identity', [m for m in middleware if m != COMPRESSION_MIDDLEWARE], 'identity'),
+                    ('gzip', middleware, 'gzip')]
+        if compression.brotli is not None:
+            variants.append(('br', middleware, 'br, gzip'))
+
+        paths = {'browse_songs': '/browse/', 'song_detail': f'/song/{song.pk}/'}
+        print(f"{'page':<14} {'encoding':<9} {'bytes':>8} {'ttfb ms':>8} {'transfer ms':>12}")
+        for page, path in paths.items():
+            for name, stack, accept_encoding in variants:
+                handler = handler_for(stack)
+                request(handler, path, accept_encoding, cookie)  # Warm up
+                results = [request(handler, path, accept_encoding, cookie) for _ in range(args.requests)]
+                size = statistics.median(size for size, _ in results)
+                ttfb = statistics.median(ttfb for _, ttfb in results) * 1000
+                transfer = size * 8 / (args.mbps * 1e6) * 1000
+                print(f'{page:<14} {name:<9} {size:>8.0f} {ttfb:>8.1f} {transfer:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Compare the old OR'd case-insensitive login lookup with the indexed probes.
+
+Builds a throwaway SQLite database with ``--users`` accounts, then times
+
+* the previous ``Q(username__iexact=...) | Q(email__iexact=...)`` query, and
+* ``get_by_username_iexact`` followed by ``get_by_email_iexact``,
+
+for a mix of username, email and unknown logins, and prints the query plans
+so you can check that the Lower() expression indexes are used.
+
+    python benchmarks/login_lookup.py --users 500000 --lookups 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_contest.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+
+def setup_database(path):
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}
+    django.setup()
+
+    from django.db import connection
+    from accounts.models import User
+    with connection.schema_editor() as editor:
+        editor.create_model(User)
+    return User
+
+
+def populate(User, count, batch_size=10000):
+    for start in range(0, count, batch_size):
+        User.objects.bulk_create([
+            User(username=f'Artist{i}', email=f'Artist{i}@Example.com', password='!')
+            for i in range(start, min(start + batch_size, count))
+        ], batch_size=batch_size)
+
+
+def time_lookups(lookup, logins):
+    started = time.perf_counter()
+    for login in logins:
+        lookup(login)
+    return (time.perf_counter() - started) / len(logins) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=500000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        User = setup_database(os.path.join(directory, 'login.sqlite3'))
+        from django.db import connection
+        from django.db.models import Q
+
+        started = time.perf_counter()
+        populate(User, args.users)
+        print(f'Created {args.users} users in {time.perf_counter() - started:.1f}s')
+
+        # A third each of usernames, emails and misses, in mixed case
+        logins = []
+        for _ in range(args.lookups):
+            i = random.randrange(args.users)
+            logins.append(random.choice([f'artist{i}', f'ARTIST{i}@example.com', f'nobody{i}']))
+
+        def old_lookup(login):
+            return User.objects.filter(Q(username__iexact=login) | Q(email__iexact=login)).first()
+
+        def new_lookup(login):
+            return User.objects.get_by_username_iexact(login) or User.objects.get_by_email_iexact(login)
+
+        print(f"{'lookup':<8} {'us/login':>10}")
+        print(f"{'or':<8} {time_lookups(old_lookup, logins):>10.1f}")
+        print(f"{'probes':<8} {time_lookups(new_lookup, logins):>10.1f}")
+
+        print('\nQuery plans:')
+        querysets = {
+            'or': User.objects.filter(Q(username__iexact='x') | Q(email__iexact='x')),
+            'username': User.objects.filter_username_iexact('x')[:2],
+            'email': User.objects.filter_email_iexact('x')[:2],
+        }
+        with connection.cursor() as cursor:
+            for name, queryset in querysets.items():
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                print(f'{name}: ' + '; '.join(row[-1] for row in cursor.fetchall()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Report where a fresh WSGI worker spends its start-up time.
+
+Runs ``python -X importtime`` on ``import ai_contest.wsgi`` in a clean
+subprocess and lists the slowest imports, by cumulative and by self time.
+Then it spawns the worker twice more, with WSGI_WARMUP off and on, and
+times the worker start-up and the first and second request to each page,
+which is what a visitor sees right after Passenger recycles a process.
+
+Uses the database configured in .env, so run it after ``migrate``:
+
+    python benchmarks/startup.py --top 25 --paths / /browse/ /leaderboard/
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_PATHS = ['/', '/browse/', '/leaderboard/', '/winners/']
+
+
+def child_env(warmup):
+    env = dict(os.environ, WSGI_WARMUP=str(warmup))
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'ai_contest.settings')
+    env.setdefault('SECRET_KEY', 'benchmark')
+    return env
+
+
+def import_times():
+    """[(self_us, cumulative_us, depth, module)] for ``import ai_contest.wsgi``"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ai_contest.wsgi'],
+        cwd=ROOT, env=child_env(False), capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr[-2000:])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def print_import_report(rows, top):
+    total = sum(self_us for self_us, _, _, _ in rows)
+    print(f'{len(rows)} modules imported in {total / 1000:.0f} ms\n')
+    print(f"{'cumulative ms':>13} {'self ms':>8}  module")
+    for self_us, cumulative_us, _, name in sorted(rows, key=lambda r: -r[1])[:top]:
+        print(f'{cumulative_us / 1000:>13.1f} {self_us / 1000:>8.1f}  {name}')
+    print(f"\n{'self ms':>8}  module (slowest on their own)")
+    for self_us, _, _, name in sorted(rows, key=lambda r: -r[0])[:top]:
+        print(f'{self_us / 1000:>8.1f}  {name}')
+
+
+def request(application, path):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(b''), 'wsgi.errors': sys.stderr,
+    }
+    statuses = []
+    started = time.perf_counter()
+    body = application(environ, lambda status, headers: statuses.append(status))
+    for _ in body:
+        pass
+    body.close()
+    return statuses[0].split()[0], time.perf_counter() - started
+
+
+def run_child(paths):
+    """Spawn-side half: import the WSGI module and time the first requests"""
+    started = time.perf_counter()
+    from ai_contest.wsgi import application
+    spawn = time.perf_counter() - started
+    from django.conf import settings
+    settings.ALLOWED_HOSTS = ['localhost']
+    timings = {}
+    for path in paths:
+        status, first = request(application, path)
+        _, second = request(application, path)
+        timings[path] = {'status': status, 'first': first, 'second': second}
+    print(json.dumps({'spawn': spawn, 'requests': timings}))
+
+
+def spawn_worker(warmup, paths):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', '--paths', *paths],
+        cwd=ROOT, env=child_env(warmup), capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr[-2000:])
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def print_request_report(paths):
+    print(f"\n{'warmup':<7} {'path':<16} {'status':>6} {'first ms':>9} {'second ms':>10}")
+    for warmup in (False, True):
+        result = spawn_worker(warmup, paths)
+        label = 'on' if warmup else 'off'
+        print(f"{label:<7} {'(spawn)':<16} {'':>6} {result['spawn'] * 1000:>9.1f}")
+        for path, timing in result['requests'].items():
+            print(f"{label:<7} {path:<16} {timing['status']:>6} "
+                  f"{timing['first'] * 1000:>9.1f} {timing['second'] * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--top', type=int, default=20, help='Number of imports to list')
+    parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS)
+    parser.add_argument('--imports-only', action='store_true')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.paths)
+        return
+    print_import_report(import_times(), args.top)
+    if not args.imports_only:
+        print_request_report(args.paths)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Compare throughput of the WSGI and ASGI deployments of the public pages.
+
+Start both servers against the same database, with the same worker count,
+then point this script at them:
+
+    gunicorn ai_contest.wsgi:application --workers 1 --bind 127.0.0.1:8001
+    daphne ai_contest.asgi:application --bind 127.0.0.1 --port 8002
+
+    python benchmarks/wsgi_vs_asgi.py --wsgi http://127.0.0.1:8001 \\
+        --asgi http://127.0.0.1:8002 --concurrency 100 --slow-read 0.05
+
+``--slow-read`` makes every client pause between reads of the response body,
+which is what ties up a sync worker while a slow mobile client downloads a
+page. Send a session cookie with ``--cookie`` to bypass the page cache.
+Only the standard library is used so it runs from any environment.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ['/', '/browse/', '/leaderboard/', '/winners/', '/song/1/']
+
+
+async def fetch(base_url, path, cookie, slow_read):
+    url = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+    request = (
+        f'GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: close\r\n'
+        + (f'Cookie: {cookie}\r\n' if cookie else '')
+        + '\r\n'
+    )
+    writer.write(request.encode('latin-1'))
+    await writer.drain()
+    status_line = await reader.readline()
+    size = len(status_line)
+    while True:
+        chunk = await reader.read(16 * 1024)
+        if not chunk:
+            break
+        size += len(chunk)
+        if slow_read:
+            await asyncio.sleep(slow_read)
+    writer.close()
+    return int(status_line.split()[1]), size
+
+
+async def run(base_url, paths, requests, concurrency, cookie, slow_read):
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(paths[i % len(paths)])
+
+    async def client():
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                status, _ = await fetch(base_url, path, cookie, slow_read)
+                if status >= 400:
+                    errors += 1
+            except OSError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'rps': requests / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--wsgi', required=True, help='Base URL of the WSGI server')
+    parser.add_argument('--asgi', required=True, help='Base URL of the ASGI server')
+    parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable)')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--slow-read', type=float, default=0.0,
+                        help='Seconds each client sleeps between 16KB body reads')
+    parser.add_argument('--cookie', default='', help='Cookie header to send, e.g. sessionid=...')
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_PATHS
+    print(f'{args.requests} requests, concurrency {args.concurrency}, slow read {args.slow_read}s')
+    print(f"{'server':<6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for name, base_url in (('wsgi', args.wsgi), ('asgi', args.asgi)):
+        result = asyncio.run(run(base_url, paths, args.requests, args.concurrency,
+                                 args.cookie, args.slow_read))
+        print(f"{name:<6} {result['rps']:>9.1f} {result['p50']:>9.1f} "
+              f"{result['p95']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
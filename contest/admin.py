@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib import messages
-from .models import Song, Vote, Comment, Winner, Tag, Deadline
+from .models import Song, Vote, Comment, Winner, Tag, Deadline, LyricsMatch
 from email_verification.services import EmailVerificationService
+from .paginators import EstimatedCountPaginator
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -13,10 +14,18 @@ class SongAdmin(admin.ModelAdmin):
     list_display = ['title', 'user', 'language', 'genre', 'average_rating', 'vote_count', 'view_count', 'is_winner', 'is_featured', 'submitted_at']
     list_filter = ['language', 'genre', 'is_winner', 'is_featured', 'submitted_at']
     search_fields = ['title', 'user__username', 'user__email']
-    readonly_fields = ['submitted_at', 'view_count', 'vote_count', 'average_rating']
+    readonly_fields = ['submitted_at', 'view_count', 'vote_count', 'average_rating', 'ranking_score']
     filter_horizontal = ['tags']
+    autocomplete_fields = ['user']
+    list_select_related = ['user']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     actions = ['mark_as_winner', 'mark_as_featured']
     
+    def get_queryset(self, request):
+        # Song.__str__ shows the artist, e.g. in the song autocomplete used by other admins
+        return super().get_queryset(request).select_related('user')
+    
     def mark_as_winner(self, request, queryset):
         """Mark selected songs as winners and send notifications"""
         count = 0
@@ -45,6 +54,10 @@ class VoteAdmin(admin.ModelAdmin):
     list_filter = ['rating', 'created_at']
     search_fields = ['user__username', 'song__title']
     readonly_fields = ['created_at']
+    autocomplete_fields = ['user', 'song']
+    list_select_related = ['user', 'song__user']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
@@ -52,6 +65,10 @@ class CommentAdmin(admin.ModelAdmin):
     list_filter = ['is_approved', 'created_at']
     search_fields = ['user__username', 'song__title', 'content']
     readonly_fields = ['created_at']
+    autocomplete_fields = ['user', 'song']
+    list_select_related = ['user', 'song__user']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     def content_preview(self, obj):
         return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
@@ -63,9 +80,36 @@ class WinnerAdmin(admin.ModelAdmin):
     list_filter = ['selected_at', 'featured_until']
     search_fields = ['song__title', 'song__user__username']
     readonly_fields = ['selected_at']
+    autocomplete_fields = ['song']
+    list_select_related = ['song__user']
+    show_full_result_count = False
+
+@admin.register(LyricsMatch)
+class LyricsMatchAdmin(admin.ModelAdmin):
+    list_display = ['song', 'other', 'similarity_display', 'status', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['song__title', 'other__title', 'song__user__username', 'other__user__username']
+    readonly_fields = ['song', 'other', 'similarity', 'created_at']
+    list_select_related = ['song', 'other']
+    actions = ['mark_as_confirmed', 'mark_as_dismissed']
     
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('song__user')
+    def similarity_display(self, obj):
+        return f"{obj.similarity:.0%}"
+    similarity_display.short_description = 'Similarity'
+    similarity_display.admin_order_field = 'similarity'
+    
+    def mark_as_confirmed(self, request, queryset):
+        """Confirm selected pairs as duplicate lyrics"""
+        updated = queryset.update(status='confirmed')
+        self.message_user(request, f'{updated} match(es) confirmed as duplicates.', messages.SUCCESS)
+    
+    def mark_as_dismissed(self, request, queryset):
+        """Dismiss selected pairs; they won't be flagged again"""
+        updated = queryset.update(status='dismissed')
+        self.message_user(request, f'{updated} match(es) dismissed.', messages.SUCCESS)
+    
+    mark_as_confirmed.short_description = "Confirm selected matches as duplicates"
+    mark_as_dismissed.short_description = "Dismiss selected matches"
 
 @admin.register(Deadline)
 class DeadlineAdmin(admin.ModelAdmin):
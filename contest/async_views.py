@@ -0,0 +1,202 @@
+"""
+Async variants of the read-heavy public contest views.
+
+These are routed instead of their counterparts in ``views.py`` when
+``ASYNC_VIEWS`` is enabled (the default under ``ai_contest.asgi``). Every
+queryset is fully evaluated with the async ORM before rendering, so the
+templates never trigger a lazy query from the event loop.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import Paginator
+from django.db.models import F
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import render
+
+from . import comment_feed, live, recommendations, site_stats, trending, unique_viewers, user_votes
+from .forms import CommentForm, SongSearchForm, VoteForm
+from .models import Deadline, Song, Winner
+from .page_cache import cache_public_page
+from .views import filter_songs, record_song_view, render_comment_page, top_artists_by_votes
+
+
+async def aevaluate(queryset):
+    return [obj async for obj in queryset]
+
+
+async def apaginate(queryset, per_page, page_number):
+    """Paginator.get_page() with the count and page slice fetched asynchronously"""
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await queryset.acount()
+    page_obj = paginator.get_page(page_number)
+    page_obj.object_list = await aevaluate(page_obj.object_list)
+    return paginator, page_obj
+
+
+async def aload_user(request):
+    """Resolve request.user up front so templates don't hit the session lazily"""
+    request.user = await request.auser()
+    return request.user
+
+
+async def aload_user_votes(request):
+    """aload_user() plus the user's ratings the templates mark songs with"""
+    await aload_user(request)
+    return await user_votes.aload(request)
+
+
+@cache_public_page('songs', 'winners', 'phase', timeout=60)
+async def home(request):
+    """Home page showing contest info and recent winners"""
+    # Check and advance phases if needed
+    await sync_to_async(Deadline.check_and_advance_phases)()
+
+    (
+        _, winners, featured_songs, top_rated_songs, trending_songs, current_phase, totals,
+    ) = await asyncio.gather(
+        aload_user_votes(request),
+        aevaluate(Winner.objects.select_related('song__user').order_by('-selected_at')[:3]),
+        aevaluate(Song.objects.filter(is_featured=True).order_by('-submitted_at')[:6]),
+        aevaluate(Song.objects.filter(vote_count__gt=0).order_by('-ranking_score')[:3]),
+        aevaluate(Song.objects.select_related('user').filter(trending_score__gt=0).order_by('-trending_score')[:6]),
+        Deadline.aget_current_phase(),
+        site_stats.asite_totals(),
+    )
+
+    context = {
+        'winners': winners,
+        'featured_songs': featured_songs,
+        'top_rated_songs': top_rated_songs,
+        'trending_songs': trending_songs,
+        'current_phase': current_phase,
+        'can_submit_songs': bool(current_phase and current_phase.status == 'open_for_submission'),
+        **totals,
+    }
+    return render(request, 'contest/home.html', context)
+
+
+@cache_public_page('winners')
+async def winners_page(request):
+    """Page showing all winners"""
+    await aload_user(request)
+    winners = Winner.objects.select_related('song__user').order_by('-selected_at')
+    _, page_obj = await apaginate(winners, 10, request.GET.get('page'))
+
+    return render(request, 'contest/winners.html', {'page_obj': page_obj})
+
+
+@cache_public_page('song:{song_id}', on_hit=record_song_view)
+async def song_detail(request, song_id):
+    """View individual song details with voting and comments"""
+    try:
+        song = await Song.objects.select_related('user').prefetch_related('tags').aget(id=song_id)
+    except Song.DoesNotExist:
+        raise Http404('No Song matches the given query.')
+
+    # Increment view count
+    await Song.objects.filter(id=song.id).aupdate(
+        view_count=F('view_count') + 1,
+        trending_score=trending.bump(trending.view_weight()),
+    )
+    song.view_count += 1
+
+    # Get user's existing rating if any
+    votes = await aload_user_votes(request)
+    unique_viewers.record(request, song.id)
+    user_rating = votes.get(song.id)
+
+    # Get the first page of comments
+    comments, next_cursor = await comment_feed.apage(song.id)
+    similar_songs = await aevaluate(recommendations.similar_songs(song.id))
+
+    context = {
+        'song': song,
+        'user_rating': user_rating,
+        'comments': comments,
+        'next_cursor': next_cursor,
+        'similar_songs': similar_songs,
+        'vote_form': VoteForm(),
+        'comment_form': CommentForm(),
+    }
+    return render(request, 'contest/song_detail.html', context)
+
+
+@cache_public_page('song:{song_id}')
+async def song_comments(request, song_id):
+    """A page of a song's approved comments, see views.song_comments"""
+    if not await Song.objects.filter(id=song_id).aexists():
+        raise Http404('No Song matches the given query.')
+    try:
+        comments, next_cursor = await comment_feed.apage(song_id, request.GET.get('cursor'))
+    except ValueError:
+        return HttpResponseBadRequest('Invalid cursor')
+    return render_comment_page(request, comments, next_cursor)
+
+
+@cache_public_page('songs')
+async def browse_songs(request):
+    """Browse all songs with search and filtering"""
+    await aload_user_votes(request)
+    form = SongSearchForm(request.GET)
+    songs = Song.objects.select_related('user').prefetch_related('tags')
+
+    if form.is_valid():
+        songs = filter_songs(songs, form.cleaned_data)
+
+    paginator, page_obj = await apaginate(songs, 12, request.GET.get('page'))
+
+    context = {
+        'form': form,
+        'page_obj': page_obj,
+        'total_results': paginator.count,
+    }
+    return render(request, 'contest/browse_songs.html', context)
+
+
+@cache_public_page('leaderboard')
+async def leaderboard(request):
+    """Show leaderboard of top artists and songs"""
+    top_artists = top_artists_by_votes()[:10]
+    top_songs = Song.objects.select_related('user').filter(vote_count__gt=0).order_by('-ranking_score')[:10]
+    most_viewed = Song.objects.select_related('user').filter(view_count__gt=0).order_by('-view_count')[:10]
+
+    _, top_artists, top_songs, most_viewed = await asyncio.gather(
+        aload_user_votes(request), aevaluate(top_artists), aevaluate(top_songs), aevaluate(most_viewed),
+    )
+
+    context = {
+        'top_artists': top_artists,
+        'top_songs': top_songs,
+        'most_viewed': most_viewed,
+    }
+    return render(request, 'contest/leaderboard.html', context)
+
+
+def event_stream_response(channel):
+    """Stream a live channel as Server-Sent Events"""
+    async def events():
+        yield 'retry: 5000\n\n'
+        async for batch in live.stream(channel):
+            if not batch:
+                yield ': keepalive\n\n'
+            for event in batch:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+
+async def song_events(request, song_id):
+    """Live rating and comment updates for one song"""
+    if not await Song.objects.filter(id=song_id).aexists():
+        raise Http404('No Song matches the given query.')
+    return event_stream_response(f'song:{song_id}')
+
+
+async def leaderboard_events(request):
+    """Live rating updates for every song, for the leaderboard"""
+    return event_stream_response('leaderboard')
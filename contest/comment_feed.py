@@ -0,0 +1,88 @@
+"""
+Keyset-paginated comment feed.
+
+A song's approved comments are listed newest first, ordered on
+``(created_at, id)`` so comments posted in the same instant still have a
+stable order. Instead of an OFFSET, which makes the database walk past
+every earlier comment, each page ends with a cursor holding the last
+comment's ``(created_at, id)``; the next page asks for the comments before
+it. With the partial ``comment_feed_idx`` index on ``(song, created_at,
+id)`` over approved comments every page is a short index range scan,
+however many comments the song has.
+
+Cursors are opaque URL-safe strings. ``Song.comment_count`` holds the total,
+so nothing here needs a COUNT.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+SEPARATOR = '|'
+
+
+def page_size():
+    return getattr(settings, 'COMMENT_PAGE_SIZE', 10)
+
+
+def encode_cursor(comment):
+    raw = f'{comment.created_at.isoformat()}{SEPARATOR}{comment.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """``(created_at, id)`` from a cursor; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit(SEPARATOR, 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f'Invalid comment cursor: {cursor!r}') from e
+
+
+def queryset(song_id, cursor=None, limit=None):
+    """
+    The page after ``cursor`` plus one extra comment, whose presence tells
+    whether there is a next page.
+    """
+    from .models import Comment
+
+    comments = (Comment.objects
+                .filter(song_id=song_id, is_approved=True)
+                .select_related('user')
+                .order_by('-created_at', '-id'))
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        # created_at <= cursor on its own gives the index a range to seek to
+        comments = comments.filter(Q(created_at__lt=created_at) | Q(id__lt=pk), created_at__lte=created_at)
+    return comments[:(limit or page_size()) + 1]
+
+
+def split(comments, limit=None):
+    """``(page, next_cursor)`` from the rows fetched by queryset()"""
+    limit = limit or page_size()
+    if len(comments) <= limit:
+        return comments, None
+    comments = comments[:limit]
+    return comments, encode_cursor(comments[-1])
+
+
+def page(song_id, cursor=None, limit=None):
+    """One page of the song's approved comments, newest first: ``(comments, next_cursor)``"""
+    return split(list(queryset(song_id, cursor, limit)), limit)
+
+
+async def apage(song_id, cursor=None, limit=None):
+    return split([comment async for comment in queryset(song_id, cursor, limit)], limit)
+
+
+def as_json(comment):
+    """The same fields as the live feed's comment events"""
+    return {
+        'id': comment.pk,
+        'author': comment.user.get_display_name(),
+        'content': comment.content,
+        'created_at': comment.created_at.isoformat(),
+    }
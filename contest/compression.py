@@ -0,0 +1,137 @@
+"""
+Response body encoders for ``CompressionMiddleware``.
+
+Brotli (from the optional ``brotli`` package) is preferred when the client
+accepts it; gzip is the fallback. Streaming bodies are compressed chunk by
+chunk and flushed after every chunk, so a streamed response reaches the
+client as soon as the view yields, exactly as it would uncompressed.
+
+BREACH: an attacker who can inject text into a compressed page and watch
+its size can recover secrets on the same page one byte at a time. Django
+already masks the CSRF token differently on every request; on top of that,
+responses to requests that carry a CSRF secret are always sent as gzip with
+a random-length file name in the gzip header ("Heal the BREACH", as
+Django's own GZipMiddleware does), so their compressed length no longer
+tracks the content. Anonymous cached pages have no token and can use brotli.
+"""
+import re
+import secrets
+import struct
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Good ratio at a cost close to gzip -6; 11 is for static files
+MAX_RANDOM_BYTES = 100
+
+ENCODING_PATTERN = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$')
+
+
+def accepted_encodings(header):
+    """Map each encoding in an Accept-Encoding header to its q-value"""
+    accepted = {}
+    for part in header.lower().split(','):
+        match = ENCODING_PATTERN.match(part)
+        if not match:
+            continue
+        try:
+            accepted[match.group(1)] = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+    return accepted
+
+
+def choose_encoding(header, allow_brotli=True):
+    """'br', 'gzip' or None for an Accept-Encoding header"""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get('*', 0)
+    if allow_brotli and brotli is not None and accepted.get('br', wildcard) > 0:
+        return 'br'
+    if accepted.get('gzip', wildcard) > 0:
+        return 'gzip'
+    return None
+
+
+# gzip
+
+def random_filename(max_random_bytes):
+    """Random 1..max_random_bytes-long printable gzip FNAME field, NUL-terminated"""
+    length = secrets.randbelow(max_random_bytes) + 1
+    return secrets.token_hex(length)[:length].encode('latin-1') + b'\x00'
+
+
+def gzip_header(pad):
+    # Magic, deflate, flags (FNAME when padded), mtime 0, no extra flags, unknown OS
+    flags = 0x08 if pad else 0
+    header = struct.pack('<BBBBIBB', 0x1f, 0x8b, 8, flags, 0, 0, 255)
+    return header + random_filename(MAX_RANDOM_BYTES) if pad else header
+
+
+class GzipEncoder:
+    """Incremental gzip member built on a raw deflate stream"""
+
+    def __init__(self, pad=False):
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.header = gzip_header(pad)
+        self.crc = 0
+        self.size = 0
+
+    def compress(self, data, flush=False):
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        out = self.compressor.compress(data)
+        if flush:
+            out += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self.take_header() + out
+
+    def finish(self):
+        trailer = struct.pack('<II', self.crc & 0xffffffff, self.size & 0xffffffff)
+        return self.take_header() + self.compressor.flush() + trailer
+
+    def take_header(self):
+        header, self.header = self.header, b''
+        return header
+
+
+class BrotliEncoder:
+
+    def __init__(self, pad=False):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY, mode=brotli.MODE_TEXT)
+
+    def compress(self, data, flush=False):
+        out = self.compressor.process(data)
+        if flush:
+            out += self.compressor.flush()
+        return out
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+ENCODERS = {'gzip': GzipEncoder, 'br': BrotliEncoder}
+
+
+def compress_bytes(data, encoding, pad=False):
+    encoder = ENCODERS[encoding](pad)
+    return encoder.compress(data) + encoder.finish()
+
+
+def compress_chunks(chunks, encoding, pad=False):
+    """Compress an iterable of byte chunks, flushing after each one"""
+    encoder = ENCODERS[encoding](pad)
+    for chunk in chunks:
+        if chunk:
+            yield encoder.compress(chunk, flush=True)
+    yield encoder.finish()
+
+
+async def acompress_chunks(chunks, encoding, pad=False):
+    encoder = ENCODERS[encoding](pad)
+    async for chunk in chunks:
+        if chunk:
+            yield encoder.compress(chunk, flush=True)
+    yield encoder.finish()
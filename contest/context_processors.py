@@ -0,0 +1,16 @@
+from django.conf import settings
+
+from . import user_votes as user_votes_module
+
+
+def user_votes(request):
+    """The visitor's ratings by song id, see contest.user_votes"""
+    return {'user_votes': user_votes_module.for_request(request)}
+
+
+def live_updates(request):
+    """
+    Whether pages should open the Server-Sent Events feeds; they are only
+    routed under the ASGI profile, see contest.urls
+    """
+    return {'live_updates': settings.ASYNC_VIEWS}
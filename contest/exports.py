@@ -0,0 +1,228 @@
+"""
+Streaming exports of contest data as CSV or JSON Lines.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` (a
+server-side cursor on PostgreSQL) and encoded one chunk at a time, so an
+export of the whole contest uses constant memory whether it is written to a
+file by ``manage.py export_contest_data`` or streamed to the browser by the
+``admin_export`` view.
+"""
+import csv
+import json
+import zlib
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .models import Comment, Song, Tag, Vote
+
+User = get_user_model()
+
+CHUNK_SIZE = 2000
+# Encoded output is yielded in pieces of roughly this many bytes
+FLUSH_BYTES = 64 * 1024
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+
+class Export:
+    """One exportable dataset: a queryset, its date field and its columns"""
+
+    def __init__(self, name, model, date_field, columns):
+        self.name = name
+        self.model = model
+        self.date_field = date_field
+        # (header, lookup) pairs
+        self.columns = columns
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+    def get_queryset(self, start=None, end=None):
+        queryset = self.model.objects.order_by('pk')
+        if start:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': start_of_day(start)})
+        if end:
+            # End date is inclusive
+            queryset = queryset.filter(**{f'{self.date_field}__lt': start_of_day(end + timedelta(days=1))})
+        return queryset
+
+    def rows(self, start=None, end=None, chunk_size=CHUNK_SIZE):
+        lookups = [lookup for _, lookup in self.columns]
+        return self.get_queryset(start, end).values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+class SongExport(Export):
+    """Songs with their artist, rating aggregates and a tag list"""
+
+    def rows(self, start=None, end=None, chunk_size=CHUNK_SIZE):
+        # Tags are many-to-many, so they are fetched with one query per chunk
+        # of songs rather than joined (which would repeat each song per tag).
+        chunk = []
+        for row in super().rows(start, end, chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield from self.with_tags(chunk)
+                chunk = []
+        yield from self.with_tags(chunk)
+
+    def with_tags(self, chunk):
+        if not chunk:
+            return
+        tags = {}
+        for song_id, name in (Tag.objects
+                              .filter(song__in=[row[0] for row in chunk])
+                              .order_by('name')
+                              .values_list('song', 'name')):
+            tags.setdefault(song_id, []).append(name)
+        for row in chunk:
+            yield row + (', '.join(tags.get(row[0], ())),)
+
+    @property
+    def headers(self):
+        return super().headers + ['tags']
+
+
+EXPORTS = {
+    export.name: export for export in [
+        SongExport('songs', Song, 'submitted_at', [
+            ('id', 'id'),
+            ('title', 'title'),
+            ('artist', 'user__username'),
+            ('artist_email', 'user__email'),
+            ('language', 'language'),
+            ('genre', 'genre'),
+            ('ai_tool_used', 'ai_tool_used'),
+            ('submitted_at', 'submitted_at'),
+            ('vote_count', 'vote_count'),
+            ('average_rating', 'average_rating'),
+            ('view_count', 'view_count'),
+            ('unique_viewers', 'unique_viewers'),
+            ('comment_count', 'comment_count'),
+            ('is_featured', 'is_featured'),
+            ('is_winner', 'is_winner'),
+            ('audio_file', 'audio_file'),
+            ('lyrics_file', 'lyrics_file'),
+        ]),
+        Export('votes', Vote, 'created_at', [
+            ('id', 'id'),
+            ('song_id', 'song_id'),
+            ('song_title', 'song__title'),
+            ('voter', 'user__username'),
+            ('rating', 'rating'),
+            ('comment', 'comment'),
+            ('created_at', 'created_at'),
+        ]),
+        Export('comments', Comment, 'created_at', [
+            ('id', 'id'),
+            ('song_id', 'song_id'),
+            ('song_title', 'song__title'),
+            ('author', 'user__username'),
+            ('content', 'content'),
+            ('is_approved', 'is_approved'),
+            ('created_at', 'created_at'),
+        ]),
+        Export('users', User, 'date_joined', [
+            ('id', 'id'),
+            ('username', 'username'),
+            ('email', 'email'),
+            ('first_name', 'first_name'),
+            ('last_name', 'last_name'),
+            ('city', 'city'),
+            ('is_verified', 'is_verified'),
+            ('is_active', 'is_active'),
+            ('date_joined', 'date_joined'),
+            ('total_songs_uploaded', 'total_songs_uploaded'),
+            ('total_votes_received', 'total_votes_received'),
+        ]),
+    ]
+}
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def parse_date(value):
+    """Parse an optional YYYY-MM-DD string; raises ValueError if malformed"""
+    return date.fromisoformat(value) if value else None
+
+
+def to_text(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+# Spreadsheets run a cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def to_csv_cell(value):
+    """to_text(), with user-written text defused so it can't open as a formula"""
+    value = to_text(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+class LineBuffer:
+    """File-like object that hands back what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(headers, rows):
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([to_csv_cell(value) for value in row])
+
+
+def jsonl_lines(headers, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(headers, map(to_text, row))), ensure_ascii=False) + '\n'
+
+
+def batched(lines):
+    """Join encoded lines into pieces of about FLUSH_BYTES"""
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= FLUSH_BYTES:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzipped(pieces):
+    """Gzip a stream of byte pieces on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    for piece in pieces:
+        compressed = compressor.compress(piece)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream(name, fmt='csv', start=None, end=None, compress=False):
+    """Yield the encoded (and optionally gzipped) export as byte pieces"""
+    export = EXPORTS[name]
+    encode = csv_lines if fmt == 'csv' else jsonl_lines
+    pieces = batched(encode(export.headers, export.rows(start, end)))
+    return gzipped(pieces) if compress else pieces
+
+
+def filename(name, fmt, start=None, end=None, compress=False):
+    parts = [name] + [day.isoformat() for day in (start, end) if day]
+    extension = FORMATS[fmt][1] + ('.gz' if compress else '')
+    return f"{'_'.join(parts)}.{extension}"
@@ -43,7 +43,7 @@ class SongSearchForm(forms.Form):
     search = forms.CharField(
         max_length=200, 
         required=False,
-        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Search songs, artists, or descriptions...'})
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Search songs, artists, descriptions or lyrics...'})
     )
     language = forms.ChoiceField(
         choices=[('', 'All Languages')] + Song.LANGUAGE_CHOICES,
@@ -62,6 +62,7 @@ class SongSearchForm(forms.Form):
             ('oldest', 'Oldest First'),
             ('highest_rated', 'Highest Rated'),
             ('most_viewed', 'Most Viewed'),
+            ('trending', 'Trending'),
         ],
         initial='newest',
         widget=forms.Select(attrs={'class': 'form-select'})
@@ -0,0 +1,362 @@
+"""
+Bulk import of partner submissions for ``manage.py import_submissions``.
+
+A manifest (CSV, a JSON list, or JSON Lines) describes one submission per
+row; audio and lyrics paths are relative to a files directory. Rows are
+validated in parallel, then imported in batches: users, songs and song-tag
+links are each written with one ``bulk_create`` per batch, and files are
+copied with ``shutil.copyfile`` (which uses ``sendfile`` on Linux).
+
+After every committed batch the index of the next row is written to a
+checkpoint file, so an interrupted import resumes where it stopped. Songs
+already present for the same artist and title are skipped, which keeps a
+batch that committed just before a crash from being imported twice.
+
+``bulk_create`` sends no ``post_save`` signals, so each batch does what the
+Song receivers would have: it adjusts the artists' song counters, queues the
+new songs for lyrics analysis and purges the cached song listings.
+"""
+import csv
+import json
+import os
+import shutil
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Lower
+
+from . import lyrics, page_cache
+from .models import Song, Tag
+
+User = get_user_model()
+
+MAX_AUDIO_BYTES = 50 * 1024 * 1024
+AUDIO_EXTENSIONS = {'.mp3', '.wav'}
+LYRICS_EXTENSIONS = {'.txt', '.pdf', '.doc', '.docx'}
+LANGUAGES = {code for code, _ in Song.LANGUAGE_CHOICES}
+GENRES = {code for code, _ in Song.GENRE_CHOICES}
+
+
+@dataclass
+class Submission:
+    """One validated manifest row"""
+    row: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+    title: str
+    description: str
+    language: str
+    genre: str
+    ai_tool_used: str
+    audio_path: str
+    lyrics_path: str
+    audio_size: int
+    tags: list = field(default_factory=list)
+
+
+def read_manifest(path):
+    """Return the manifest rows as dicts"""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if path.endswith('.csv'):
+            return list(csv.DictReader(f))
+        text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def clean(value):
+    return str(value if value is not None else '').strip()
+
+
+def validate_row(index, data, files_dir):
+    """Return a Submission, or raise ValidationError listing every problem in the row"""
+    errors = []
+    values = {name: clean(data.get(name)) for name in (
+        'username', 'email', 'first_name', 'last_name', 'title', 'description',
+        'language', 'genre', 'ai_tool_used', 'audio_file', 'lyrics_file',
+    )}
+
+    for name in ('username', 'email', 'title', 'language', 'ai_tool_used', 'audio_file', 'lyrics_file'):
+        if not values[name]:
+            errors.append(f'{name} is required')
+    if values['username']:
+        try:
+            UnicodeUsernameValidator()(values['username'])
+        except ValidationError:
+            errors.append(f"invalid username {values['username']!r}")
+    if values['email']:
+        try:
+            validate_email(values['email'])
+        except ValidationError:
+            errors.append(f"invalid email {values['email']!r}")
+    if len(values['title']) > 200:
+        errors.append('title is longer than 200 characters')
+    language = values['language'].lower()
+    if language and language not in LANGUAGES:
+        errors.append(f"unknown language {values['language']!r}")
+    genre = values['genre'].lower().replace(' ', '_') or 'other'
+    if genre not in GENRES:
+        errors.append(f"unknown genre {values['genre']!r}")
+
+    paths = {}
+    for name, extensions in (('audio_file', AUDIO_EXTENSIONS), ('lyrics_file', LYRICS_EXTENSIONS)):
+        if not values[name]:
+            continue
+        path = os.path.join(files_dir, values[name])
+        if os.path.splitext(path)[1].lower() not in extensions:
+            errors.append(f"{name} must be one of {', '.join(sorted(extensions))}")
+        elif not os.path.isfile(path):
+            errors.append(f'{name} not found: {path}')
+        else:
+            paths[name] = path
+    audio_size = os.path.getsize(paths['audio_file']) if 'audio_file' in paths else 0
+    if audio_size > MAX_AUDIO_BYTES:
+        errors.append('audio_file is larger than 50MB')
+
+    if errors:
+        raise ValidationError(errors)
+
+    tags = data.get('tags') or []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return Submission(
+        row=index,
+        username=values['username'],
+        email=values['email'],
+        first_name=values['first_name'],
+        last_name=values['last_name'],
+        title=values['title'],
+        description=values['description'],
+        language=language,
+        genre=genre,
+        ai_tool_used=values['ai_tool_used'][:100],
+        audio_path=paths['audio_file'],
+        lyrics_path=paths['lyrics_file'],
+        audio_size=audio_size,
+        tags=sorted({clean(tag)[:30] for tag in tags if clean(tag)}),
+    )
+
+
+def validate_rows(rows, files_dir, start, workers):
+    """
+    Validate rows[start:] on a thread pool (the work is mostly file stats).
+    Returns (submissions, {row index: [errors]}), both in manifest order.
+    """
+    def check(index):
+        try:
+            return index, validate_row(index, rows[index], files_dir), None
+        except ValidationError as e:
+            return index, None, e.messages
+
+    submissions, errors = [], {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for index, submission, messages in pool.map(check, range(start, len(rows))):
+            if submission is not None:
+                submissions.append(submission)
+            else:
+                errors[index] = messages
+    return submissions, errors
+
+
+def read_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)['next_row']
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path, next_row):
+    # Write then rename, so a crash never leaves a truncated checkpoint
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump({'next_row': next_row}, f)
+    os.replace(temp_path, path)
+
+
+def copy_into_storage(field_name, source_path):
+    """Copy a file into the song field's storage and return its storage name"""
+    model_field = Song._meta.get_field(field_name)
+    storage = model_field.storage
+    name = storage.get_available_name(
+        model_field.generate_filename(None, os.path.basename(source_path))
+    )
+    try:
+        destination = storage.path(name)
+    except NotImplementedError:
+        # Remote storage: fall back to an ordinary upload
+        with open(source_path, 'rb') as f:
+            return storage.save(name, File(f))
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    shutil.copyfile(source_path, destination)
+    return name
+
+
+def delete_from_storage(field_name, names):
+    storage = Song._meta.get_field(field_name).storage
+    for name in names:
+        storage.delete(name)
+
+
+def get_or_create_users(submissions):
+    """
+    Map lowercased username to user, creating missing accounts in one query.
+    Returns (users, users created, {row index: [errors]}); a new username
+    whose email already belongs to another account is rejected, not created.
+    """
+    # Lowered by the database on both sides, like AccountUserManager's lookups
+    usernames = [Lower(Value(username)) for username in {submission.username for submission in submissions}]
+    users = {
+        user.username.lower(): user
+        for user in User.objects.alias(username_lower=Lower('username')).filter(username_lower__in=usernames)
+    }
+    emails = [Lower(Value(email)) for email in {submission.email for submission in submissions
+                                                if submission.username.lower() not in users}]
+    taken_emails = {
+        email.lower(): username
+        for username, email in User.objects.alias(email_lower=Lower('email'))
+                                           .filter(email_lower__in=emails)
+                                           .values_list('username', 'email')
+    }
+    new_users, rejected = {}, {}
+    for submission in submissions:
+        key = submission.username.lower()
+        if key in users or key in new_users:
+            continue
+        owner = taken_emails.get(submission.email.lower())
+        if owner is not None:
+            rejected[submission.row] = [f'email {submission.email!r} already belongs to user {owner!r}']
+            continue
+        taken_emails[submission.email.lower()] = submission.username
+        user = User(username=submission.username, email=submission.email,
+                    first_name=submission.first_name, last_name=submission.last_name)
+        user.set_unusable_password()
+        new_users[key] = user
+    if new_users:
+        User.objects.bulk_create(new_users.values())
+        # bulk_create doesn't return primary keys on every backend
+        created = {
+            user.username: user
+            for user in User.objects.filter(username__in=[u.username for u in new_users.values()])
+        }
+        users.update({key: created[user.username] for key, user in new_users.items()})
+    return users, len(new_users), rejected
+
+
+def get_or_create_tags(names):
+    """Map tag name to Tag, creating the missing ones"""
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    return {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+
+
+def import_batch(submissions):
+    """
+    Import one batch of validated submissions in a single transaction.
+    Returns (songs created, users created, songs skipped as duplicates,
+    {row index: [errors]} for rows rejected against existing accounts).
+    """
+    copied = {'audio_file': [], 'lyrics_file': []}
+    try:
+        with transaction.atomic():
+            users, users_created, rejected = get_or_create_users(submissions)
+            submissions = [s for s in submissions if s.row not in rejected]
+
+            existing = set(Song.objects.filter(
+                user__in=[users[s.username.lower()] for s in submissions],
+                title__in={s.title for s in submissions},
+            ).values_list('user_id', 'title'))
+
+            pending = []
+            for submission in submissions:
+                user = users[submission.username.lower()]
+                if (user.pk, submission.title) in existing:
+                    continue
+                existing.add((user.pk, submission.title))
+                audio_name = copy_into_storage('audio_file', submission.audio_path)
+                copied['audio_file'].append(audio_name)
+                lyrics_name = copy_into_storage('lyrics_file', submission.lyrics_path)
+                copied['lyrics_file'].append(lyrics_name)
+                pending.append((submission, Song(
+                    user=user,
+                    title=submission.title,
+                    description=submission.description,
+                    language=submission.language,
+                    genre=submission.genre,
+                    ai_tool_used=submission.ai_tool_used,
+                    audio_file=audio_name,
+                    lyrics_file=lyrics_name,
+                    file_size_mb=submission.audio_size / (1024 * 1024),
+                )))
+
+            songs = Song.objects.bulk_create([song for _, song in pending])
+
+            tags = get_or_create_tags({name for submission, _ in pending for name in submission.tags})
+            SongTag = Song.tags.through
+            SongTag.objects.bulk_create([
+                SongTag(song_id=song.pk, tag_id=tags[name].pk)
+                for submission, song in pending for name in submission.tags
+            ])
+
+            # bulk_create skips the signals that maintain the user counters
+            for user_id, count in Counter(song.user_id for song in songs).items():
+                User.objects.filter(pk=user_id).update(
+                    total_songs_uploaded=F('total_songs_uploaded') + count
+                )
+            # ...and the ones that analyze lyrics and purge cached listings
+            if songs:
+                transaction.on_commit(lambda: after_import([song.pk for song in songs]))
+    except Exception:
+        for field_name, names in copied.items():
+            delete_from_storage(field_name, names)
+        raise
+
+    return len(songs), users_created, len(submissions) - len(songs), rejected
+
+
+def after_import(song_ids):
+    if getattr(settings, 'LYRICS_ANALYSIS_ON_SAVE', True):
+        for song_id in song_ids:
+            lyrics.schedule(song_id)
+    page_cache.purge('songs', 'leaderboard')
+
+
+def run_import(rows, files_dir, checkpoint_path, batch_size=200, workers=8, progress=None):
+    """
+    Validate and import ``rows``, resuming from the checkpoint. Returns a
+    dict of totals plus the validation errors keyed by row index.
+    """
+    start = read_checkpoint(checkpoint_path)
+    submissions, errors = validate_rows(rows, files_dir, start, workers)
+    totals = {'songs': 0, 'users': 0, 'duplicates': 0, 'invalid': len(errors), 'skipped_rows': start}
+
+    for offset in range(0, len(submissions), batch_size):
+        batch = submissions[offset:offset + batch_size]
+        songs, users, duplicates, rejected = import_batch(batch)
+        totals['songs'] += songs
+        totals['users'] += users
+        totals['duplicates'] += duplicates
+        totals['invalid'] += len(rejected)
+        errors.update(rejected)
+        # Invalid rows before the next batch are done too
+        next_row = submissions[offset + batch_size].row if offset + batch_size < len(submissions) else len(rows)
+        write_checkpoint(checkpoint_path, next_row)
+        if progress:
+            progress(next_row, len(rows), totals)
+
+    if not submissions:
+        write_checkpoint(checkpoint_path, len(rows))
+    return totals, dict(sorted(errors.items()))
@@ -0,0 +1,181 @@
+"""
+In-process pub/sub for the live (Server-Sent Events) song and leaderboard feeds.
+
+Model signals ``publish()`` small events on channels such as ``song:42`` and
+``leaderboard``. Each SSE connection holds a ``Subscription`` that coalesces
+bursts (only the latest rating of a song is kept) and caps how many events it
+will hold, so a slow client can never make the server buffer without bound.
+
+Two brokers are available through ``settings.LIVE_BROKER``:
+
+* ``local`` fans events out to subscribers in the same process. Enough for a
+  single ASGI worker.
+* ``cache`` writes events to the shared cache (Redis in production) under a
+  per-channel sequence number and has subscribers poll for new ones, so
+  events published by any worker reach every worker.
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = 'live'
+
+
+class Subscription:
+    """A bounded, coalescing queue of events for one SSE connection"""
+
+    def __init__(self, channel, max_pending=None):
+        self.channel = channel
+        self.max_pending = max_pending or getattr(settings, 'LIVE_MAX_PENDING_EVENTS', 50)
+        self.pending = OrderedDict()
+        self.loop = asyncio.get_running_loop()
+        self.ready = asyncio.Event()
+
+    def push(self, event):
+        # Events with the same key replace each other, e.g. successive
+        # rating updates for one song collapse into the latest.
+        key = event.get('key') or id(event)
+        self.pending.pop(key, None)
+        self.pending[key] = event
+        while len(self.pending) > self.max_pending:
+            self.pending.popitem(last=False)
+        self.ready.set()
+
+    def push_threadsafe(self, event):
+        self.loop.call_soon_threadsafe(self.push, event)
+
+    async def get_batch(self, timeout, coalesce_window):
+        """Wait for events, then give a burst a moment to coalesce"""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        if coalesce_window:
+            await asyncio.sleep(coalesce_window)
+        batch = list(self.pending.values())
+        self.pending.clear()
+        self.ready.clear()
+        return batch
+
+
+class LocalBroker:
+    """Fan events out to subscribers living in this process"""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.push_threadsafe(event)
+
+    async def subscribe(self, subscription):
+        with self.lock:
+            self.subscribers.setdefault(subscription.channel, set()).add(subscription)
+
+    async def unsubscribe(self, subscription):
+        with self.lock:
+            channel_subscribers = self.subscribers.get(subscription.channel)
+            if channel_subscribers is not None:
+                channel_subscribers.discard(subscription)
+                if not channel_subscribers:
+                    del self.subscribers[subscription.channel]
+
+    async def poll(self, subscription):
+        """Nothing to poll; local events are pushed straight to subscribers"""
+
+
+class CacheBroker(LocalBroker):
+    """
+    Share events between processes through the cache.
+
+    Each channel has a sequence counter; event ``n`` is stored under its own
+    short-lived key. Subscribers remember the last sequence they saw and
+    fetch anything newer on every poll, with one ``get`` for the counter
+    and one ``get_many`` for the events.
+    """
+
+    def __init__(self, event_ttl=60):
+        super().__init__()
+        self.event_ttl = event_ttl
+
+    def seq_key(self, channel):
+        return f'{KEY_PREFIX}:{channel}:seq'
+
+    def event_key(self, channel, seq):
+        return f'{KEY_PREFIX}:{channel}:{seq}'
+
+    def publish(self, channel, event):
+        key = self.seq_key(channel)
+        cache.add(key, 0, timeout=None)
+        seq = cache.incr(key)
+        cache.set(self.event_key(channel, seq), event, self.event_ttl)
+
+    async def subscribe(self, subscription):
+        subscription.last_seq = await cache.aget(self.seq_key(subscription.channel), 0)
+
+    async def unsubscribe(self, subscription):
+        pass
+
+    async def poll(self, subscription):
+        channel = subscription.channel
+        latest = await cache.aget(self.seq_key(channel), 0)
+        if latest <= subscription.last_seq:
+            return
+        # Anything older than max_pending would be dropped anyway
+        first = max(subscription.last_seq + 1, latest - subscription.max_pending + 1)
+        keys = [self.event_key(channel, seq) for seq in range(first, latest + 1)]
+        events = await cache.aget_many(keys)
+        for key in keys:
+            if key in events:
+                subscription.push(events[key])
+        subscription.last_seq = latest
+
+
+BROKERS = {
+    'local': LocalBroker,
+    'cache': CacheBroker,
+}
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = BROKERS[getattr(settings, 'LIVE_BROKER', 'local')]()
+    return _broker
+
+
+def publish(channel, event):
+    get_broker().publish(channel, event)
+
+
+async def stream(channel, heartbeat=15, poll_interval=1.0, coalesce_window=0.25):
+    """
+    Yield batches of events for one connection; an empty batch means
+    "send a heartbeat". Runs until the client disconnects.
+    """
+    broker = get_broker()
+    subscription = Subscription(channel)
+    await broker.subscribe(subscription)
+    idle = 0.0
+    try:
+        while True:
+            await broker.poll(subscription)
+            batch = await subscription.get_batch(poll_interval, coalesce_window)
+            if batch:
+                idle = 0.0
+                yield batch
+            else:
+                idle += poll_interval
+                if idle >= heartbeat:
+                    idle = 0.0
+                    yield []
+    finally:
+        await broker.unsubscribe(subscription)
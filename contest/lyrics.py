@@ -0,0 +1,259 @@
+"""
+Lyrics text extraction and near-duplicate detection.
+
+Every song's lyrics file is turned into normalized plain text (stored in
+``SongLyrics`` and searchable from the browse page) and a MinHash signature
+over its word 3-grams. Two signatures agree in a given position with
+probability equal to the Jaccard similarity of the two shingle sets, so the
+fraction of agreeing positions estimates how much text two songs share.
+
+Comparing every pair would be quadratic, so signatures are split into
+``BANDS`` bands of ``ROWS`` values (locality-sensitive hashing). Each band is
+hashed into a bucket stored in ``LyricsBand``; only songs that land in the
+same bucket for at least one band are compared. With 32 bands of 4 rows a
+pair with Jaccard similarity 0.5 is caught ~87% of the time and one with
+0.7 virtually always, while unrelated songs almost never collide.
+
+Pairs at or above ``LYRICS_DUPLICATE_THRESHOLD`` are recorded as
+``LyricsMatch`` rows for review in the Django admin.
+
+New uploads are analyzed on a background thread after the upload commits;
+``manage.py process_lyrics`` catches up on anything else.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import unicodedata
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+
+from .models import LyricsBand, LyricsMatch, Song, SongLyrics
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+PRIME = 4294967311  # Smallest prime above 2**32
+PERMUTATION_SEED = 20250101
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def duplicate_threshold():
+    return getattr(settings, 'LYRICS_DUPLICATE_THRESHOLD', 0.5)
+
+
+# Extraction
+
+def decode_text(data):
+    for encoding in ('utf-8-sig', 'utf-16'):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode('cp1252', errors='replace')
+
+
+def extract_pdf(data):
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+def extract_docx(data):
+    """Paragraph text from word/document.xml"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    paragraphs = []
+    for paragraph in root.iter(f'{WORD_NAMESPACE}p'):
+        paragraphs.append(''.join(node.text or '' for node in paragraph.iter(f'{WORD_NAMESPACE}t')))
+    return '\n'.join(paragraphs)
+
+
+def extract_doc(data):
+    """
+    Best effort for legacy Word files: pull runs of readable text out of the
+    binary, trying UTF-16 (how Word 97+ usually stores text) and cp1252.
+    """
+    runs = []
+    for text in (data.decode('utf-16-le', errors='ignore'), data.decode('cp1252', errors='ignore')):
+        runs.extend(re.findall(r"[^\W\d_][\w ,.'!?\-]{7,}", text))
+    return '\n'.join(runs)
+
+
+EXTRACTORS = {
+    '.txt': decode_text,
+    '.pdf': extract_pdf,
+    '.docx': extract_docx,
+    '.doc': extract_doc,
+}
+
+
+def extract_text(field_file):
+    """Plain text of a lyrics FieldFile; raises ValueError for unsupported types"""
+    extension = os.path.splitext(field_file.name)[1].lower()
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None:
+        raise ValueError(f'Unsupported lyrics file type: {extension}')
+    with field_file.storage.open(field_file.name, 'rb') as f:
+        return extractor(f.read())
+
+
+def normalize(text):
+    """Casefolded words separated by single spaces, punctuation removed"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return ' '.join(re.findall(r'\w+', text))
+
+
+# MinHash and LSH
+
+def shingles(text):
+    words = text.split()
+    if len(words) < SHINGLE_WORDS:
+        return {text} if text else set()
+    return {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+@cache
+def permutations():
+    """(a, b) coefficients of the hash permutations, fixed so signatures stay comparable"""
+    import numpy as np
+    rng = np.random.default_rng(PERMUTATION_SEED)
+    return (rng.integers(1, 2 ** 32, size=NUM_PERM, dtype=np.uint64),
+            rng.integers(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64))
+
+
+def minhash(shingle_set):
+    """NUM_PERM-value MinHash signature of a non-empty set of shingles"""
+    import numpy as np
+    perm_a, perm_b = permutations()
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+         for s in shingle_set),
+        dtype=np.uint64, count=len(shingle_set),
+    )
+    # (a * x + b) mod p for every permutation and shingle at once; all terms
+    # are below 2**32, so the products fit in uint64
+    permuted = (np.outer(hashes, perm_a) + perm_b) % np.uint64(PRIME)
+    return permuted.min(axis=0)
+
+
+def band_buckets(signature):
+    """One signed 64-bit bucket id per band"""
+    return [
+        int.from_bytes(hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(),
+                                       digest_size=8).digest(), 'little', signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def similarity(signature, other):
+    """Fraction of agreeing positions, an estimate of the Jaccard similarity"""
+    return float((signature == other).mean())
+
+
+def to_signature(data):
+    import numpy as np
+    return np.frombuffer(bytes(data), dtype=np.uint64)
+
+
+# Pipeline
+
+def analyze(song):
+    """Extract, normalize and sign one song's lyrics; no database access"""
+    try:
+        text = normalize(extract_text(song.lyrics_file)) if song.lyrics_file else ''
+        error = ''
+    except Exception as e:
+        text, error = '', str(e)[:255]
+    shingle_set = shingles(text)
+    signature = minhash(shingle_set) if shingle_set else None
+    return text, signature, error
+
+
+def store(song, text, signature, error=''):
+    """Save the analysis, re-bucket the song and record its near-duplicates"""
+    with transaction.atomic():
+        # Writing first takes the (on SQLite, database) write lock up front. A
+        # transaction that starts with update_or_create's SELECT is a reader,
+        # and upgrading it fails at once with "database is locked" under WAL
+        # instead of waiting out busy_timeout.
+        LyricsBand.objects.filter(song=song).delete()
+        # Pending flags are re-derived below; reviewed ones are kept
+        LyricsMatch.objects.filter(Q(song=song) | Q(other=song), status='pending').delete()
+        SongLyrics.objects.update_or_create(song=song, defaults={
+            'text': text,
+            'signature': signature.tobytes() if signature is not None else None,
+            'source_name': song.lyrics_file.name or '',
+            'error': error,
+        })
+        if signature is None:
+            return 0
+
+        buckets = band_buckets(signature)
+        LyricsBand.objects.bulk_create([
+            LyricsBand(song=song, band=band, bucket=bucket) for band, bucket in enumerate(buckets)
+        ])
+
+        candidate_filter = Q()
+        for band, bucket in enumerate(buckets):
+            candidate_filter |= Q(band=band, bucket=bucket)
+        candidates = (LyricsBand.objects.filter(candidate_filter).exclude(song=song)
+                      .values_list('song_id', flat=True).distinct())
+
+        threshold = duplicate_threshold()
+        found = 0
+        for other_id, other_signature in (SongLyrics.objects
+                                          .filter(song_id__in=candidates, signature__isnull=False)
+                                          .values_list('song_id', 'signature')):
+            score = similarity(signature, to_signature(other_signature))
+            if score < threshold:
+                continue
+            low, high = sorted((song.pk, other_id))
+            LyricsMatch.objects.update_or_create(
+                song_id=low, other_id=high, defaults={'similarity': score}
+            )
+            found += 1
+        return found
+
+
+def process_song(song):
+    text, signature, error = analyze(song)
+    return store(song, text, signature, error)
+
+
+def songs_needing_analysis():
+    """Songs never analyzed or whose lyrics file changed since"""
+    return Song.objects.exclude(lyrics__source_name=F('lyrics_file')).order_by('id')
+
+
+_executor = None
+
+
+def schedule(song_id):
+    """Analyze a song on the background thread"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='lyrics')
+    _executor.submit(_process_in_background, song_id)
+
+
+def _process_in_background(song_id):
+    try:
+        song = Song.objects.filter(pk=song_id).first()
+        if song is not None:
+            process_song(song)
+    except Exception:
+        logger.exception(f"Lyrics analysis failed for song {song_id}")
+    finally:
+        close_old_connections()
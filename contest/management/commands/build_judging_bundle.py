@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from contest import judging_bundle
+from contest.models import Song
+
+
+class Command(BaseCommand):
+    help = 'Write a ZIP of all submissions (audio, lyrics and a manifest CSV) for the judging panel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--language', choices=[code for code, _ in Song.LANGUAGE_CHOICES])
+        parser.add_argument('--genre', choices=[code for code, _ in Song.GENRE_CHOICES])
+        parser.add_argument('--output', '-o',
+                            help='File to write; defaults to a generated name, or "-" for stdout')
+
+    def handle(self, *args, **options):
+        language, genre = options['language'], options['genre']
+        output = options['output'] or judging_bundle.bundle_filename(language, genre)
+        chunks = judging_bundle.stream_bundle(judging_bundle.bundle_songs(language, genre))
+
+        if output == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        size = 0
+        with open(output, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f'Wrote {size} bytes to {output}.'))
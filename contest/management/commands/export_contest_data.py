@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from contest import exports
+
+
+class Command(BaseCommand):
+    help = 'Export songs, votes, comments or users as CSV or JSON Lines without loading them into memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(exports.EXPORTS))
+        parser.add_argument('--format', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--start', help='Only rows created on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Only rows created on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--output', '-o',
+                            help='File to write; defaults to a generated name, or "-" for stdout')
+
+    def handle(self, *args, **options):
+        try:
+            start = exports.parse_date(options['start'])
+            end = exports.parse_date(options['end'])
+        except ValueError:
+            raise CommandError('--start and --end must be dates in YYYY-MM-DD format.')
+
+        dataset, fmt, compress = options['dataset'], options['format'], options['gzip']
+        output = options['output'] or exports.filename(dataset, fmt, start, end, compress)
+        pieces = exports.stream(dataset, fmt, start, end, compress)
+
+        if output == '-':
+            for piece in pieces:
+                sys.stdout.buffer.write(piece)
+            sys.stdout.buffer.flush()
+            return
+
+        size = 0
+        with open(output, 'wb') as f:
+            for piece in pieces:
+                f.write(piece)
+                size += len(piece)
+        self.stderr.write(self.style.SUCCESS(f'Wrote {size} bytes to {output}.'))
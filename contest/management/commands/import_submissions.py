@@ -0,0 +1,72 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from contest import importer
+
+
+class Command(BaseCommand):
+    help = 'Bulk import partner submissions (users, songs, tags and files) from a CSV or JSON manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help='CSV, JSON list or JSON Lines file, one submission per row')
+        parser.add_argument('--files-dir',
+                            help='Directory the audio_file and lyrics_file paths are relative to '
+                                 '(defaults to the manifest\'s directory)')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Submissions committed per transaction')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Threads used to validate rows and check files')
+        parser.add_argument('--checkpoint',
+                            help='Checkpoint file for resuming (defaults to <manifest>.checkpoint)')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore an existing checkpoint and start from the first row')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only validate the manifest')
+
+    def handle(self, *args, **options):
+        manifest = options['manifest']
+        if not os.path.isfile(manifest):
+            raise CommandError(f'Manifest not found: {manifest}')
+        files_dir = options['files_dir'] or os.path.dirname(os.path.abspath(manifest))
+        checkpoint = options['checkpoint'] or f'{manifest}.checkpoint'
+        if options['restart'] and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        try:
+            rows = importer.read_manifest(manifest)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise CommandError(f'Could not read manifest: {e}')
+
+        if options['dry_run']:
+            submissions, errors = importer.validate_rows(rows, files_dir, 0, options['workers'])
+            self.report_errors(errors)
+            self.stdout.write(f'{len(submissions)} valid rows, {len(errors)} invalid.')
+            return
+
+        def progress(next_row, total, totals):
+            self.stdout.write(f"Row {next_row}/{total}: {totals['songs']} songs, "
+                              f"{totals['users']} new users")
+
+        totals, errors = importer.run_import(
+            rows, files_dir, checkpoint,
+            batch_size=options['batch_size'], workers=options['workers'], progress=progress,
+        )
+        self.report_errors(errors)
+        if totals['skipped_rows']:
+            self.stdout.write(f"Resumed after row {totals['skipped_rows']} from {checkpoint}.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {totals['songs']} songs and {totals['users']} new users; "
+            f"{totals['duplicates']} duplicates and {totals['invalid']} invalid rows skipped."
+        ))
+        if totals['songs']:
+            if getattr(settings, 'LYRICS_ANALYSIS_ON_SAVE', True):
+                self.stdout.write('Analyzing the lyrics of the imported songs before exiting...')
+            else:
+                self.stdout.write('Run `python manage.py process_lyrics` to analyze their lyrics.')
+
+    def report_errors(self, errors):
+        for index, messages in errors.items():
+            # Row numbers as a spreadsheet shows them (header is row 1)
+            self.stderr.write(f"Row {index + 2}: {'; '.join(messages)}")
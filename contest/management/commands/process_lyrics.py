@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from contest import lyrics
+from contest.models import LyricsMatch, Song
+
+
+class Command(BaseCommand):
+    help = 'Extract lyrics text and flag near-duplicate lyrics for songs not analyzed yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Re-analyze every song, not only new or changed lyrics')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Threads extracting text and computing signatures')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        songs = Song.objects.order_by('id') if options['all'] else lyrics.songs_needing_analysis()
+        song_ids = list(songs.values_list('id', flat=True))
+        processed = failed = 0
+
+        # Extraction and hashing run on the pool; database writes stay on
+        # this thread, one song at a time, so matches see earlier songs
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for offset in range(0, len(song_ids), options['batch_size']):
+                batch = list(Song.objects.filter(id__in=song_ids[offset:offset + options['batch_size']])
+                             .order_by('id'))
+                for song, (text, signature, error) in zip(batch, pool.map(lyrics.analyze, batch)):
+                    lyrics.store(song, text, signature, error)
+                    processed += 1
+                    if error:
+                        failed += 1
+                        self.stderr.write(f'Song {song.pk}: {error}')
+                self.stdout.write(f'{processed}/{len(song_ids)} songs analyzed')
+
+        pending = LyricsMatch.objects.filter(status='pending').count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Analyzed {processed} songs ({failed} unreadable); {pending} near-duplicate matches pending review.'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from contest import page_cache, ranking
+
+
+class Command(BaseCommand):
+    help = 'Recompute every song\'s vote count, average rating and Bayesian ranking score from the votes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of songs written per UPDATE')
+
+    def handle(self, *args, **options):
+        updated = ranking.recompute_all(batch_size=options['batch_size'])
+        if updated:
+            page_cache.purge('songs', 'leaderboard')
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {updated} songs (contest mean rating {ranking.get_prior_mean():.2f}).'
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from contest import page_cache
+from contest.models import Song
+
+
+class Command(BaseCommand):
+    help = 'Recompute every song\'s comment_count from its approved comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of songs written per UPDATE')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted counters without writing them')
+
+    def handle(self, *args, **options):
+        # One grouped query over songs and comments
+        actual = (Song.objects
+                  .annotate(approved=Count('comments', filter=Q(comments__is_approved=True)))
+                  .values_list('pk', 'comment_count', 'approved'))
+
+        drifted = [
+            Song(pk=pk, comment_count=approved)
+            for pk, comment_count, approved in actual.iterator(chunk_size=2000)
+            if comment_count != approved
+        ]
+
+        if drifted and not options['dry_run']:
+            with transaction.atomic():
+                Song.objects.bulk_update(drifted, ['comment_count'], batch_size=options['batch_size'])
+            page_cache.purge('songs', *(f'song:{song.pk}' for song in drifted))
+
+        verb = 'Would fix' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} comment counts for {len(drifted)} songs.'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from contest import page_cache, recommendations
+
+
+class Command(BaseCommand):
+    help = 'Recompute "listeners also rated" neighbors for songs whose votes changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recompute every song instead of only the affected ones')
+        parser.add_argument('--neighbors', type=int,
+                            help='Neighbors kept per song (defaults to RECOMMENDATION_NEIGHBORS)')
+
+    def handle(self, *args, **options):
+        refreshed = recommendations.refresh(full=options['full'], k=options['neighbors'])
+        if refreshed:
+            page_cache.purge(*(f'song:{song_id}' for song_id in refreshed))
+        self.stdout.write(self.style.SUCCESS(f'Refreshed neighbors for {len(refreshed)} songs.'))
@@ -0,0 +1,30 @@
+from urllib.error import URLError
+
+from django.core.management.base import BaseCommand, CommandError
+
+from contest import vendor
+
+
+class Command(BaseCommand):
+    help = 'Download, verify and subset the vendor files pinned in static/vendor/manifest.json'
+
+    def add_arguments(self, parser):
+        parser.add_argument('packages', nargs='*',
+                            help='Packages to vendor (defaults to every package in the manifest)')
+        parser.add_argument('--refresh', action='store_true',
+                            help='Download again instead of reusing .vendor-cache')
+
+    def handle(self, *args, **options):
+        manifest = vendor.load_manifest()
+        packages = options['packages'] or list(manifest)
+        unknown = set(packages) - set(manifest)
+        if unknown:
+            raise CommandError(f"Unknown package(s): {', '.join(sorted(unknown))}")
+
+        for name in packages:
+            try:
+                vendor.vendor_package(name, refresh=options['refresh'], log=self.stdout.write)
+            except (vendor.VendorError, URLError, OSError) as e:
+                raise CommandError(f'{name}: {e}')
+            self.stdout.write(self.style.SUCCESS(f"Vendored {name} {manifest[name]['version']}"))
+        self.stdout.write('Commit static/vendor and run collectstatic to publish the files.')
@@ -0,0 +1,152 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import http_date
+import logging
+
+from . import compression, page_cache
+
+logger = logging.getLogger(__name__)
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serve public pages to anonymous visitors from the page cache.
+
+    Must sit above SessionMiddleware so it can see (and refuse to cache)
+    responses that set cookies. Only views decorated with
+    ``page_cache.cache_public_page`` are stored. Works under both WSGI and
+    ASGI without forcing the async request path onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not page_cache.is_cacheable_request(request):
+            return self.get_response(request)
+
+        entry = page_cache.lookup(request)
+        if entry is not None:
+            self.run_hit_hook(request)
+            return self.build_response(request, entry, cache_status='HIT')
+
+        response = self.get_response(request)
+        entry = page_cache.store(request, response)
+        if entry is None:
+            return response
+        return self.build_response(request, entry, cache_status='MISS', response=response)
+
+    async def __acall__(self, request):
+        if not page_cache.is_cacheable_request(request):
+            return await self.get_response(request)
+
+        entry = await sync_to_async(page_cache.lookup)(request)
+        if entry is not None:
+            await sync_to_async(self.run_hit_hook)(request)
+            return self.build_response(request, entry, cache_status='HIT')
+
+        response = await self.get_response(request)
+        entry = await sync_to_async(page_cache.store)(request, response)
+        if entry is None:
+            return response
+        return self.build_response(request, entry, cache_status='MISS', response=response)
+
+    def run_hit_hook(self, request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return
+        on_hit = getattr(match.func, 'on_page_cache_hit', None)
+        if on_hit is None:
+            return
+        try:
+            on_hit(request, *match.args, **match.kwargs)
+        except Exception as e:
+            logger.error(f"Page cache hit hook failed for {request.path}: {str(e)}")
+
+    def build_response(self, request, entry, cache_status, response=None):
+        conditional = get_conditional_response(
+            request, etag=entry['etag'], last_modified=int(entry['last_modified'])
+        )
+        if conditional is not None:
+            response = conditional
+        elif response is None:
+            response = HttpResponse(entry['content'], status=entry['status'])
+            for header, value in entry['headers']:
+                response[header] = value
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        response['X-Page-Cache'] = cache_status
+        patch_cache_control(response, max_age=0, must_revalidate=True)
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Brotli or gzip compress text responses, including streamed ones.
+
+    Sits just below WhiteNoise, which serves its own precompressed files,
+    and above the page cache, so cached pages are stored once and compressed
+    per client. Skips bodies shorter than COMPRESSION_MIN_LENGTH, content
+    types that don't compress (audio, images, ZIPs...) and event streams.
+    Responses to requests holding a CSRF secret get BREACH padding, see
+    contest.compression.
+    """
+    compressible_types = (
+        'text/', 'application/json', 'application/javascript', 'application/xml',
+        'application/x-ndjson', 'application/manifest+json', 'image/svg+xml',
+    )
+    skipped_types = ('text/event-stream',)
+
+    def process_response(self, request, response):
+        min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 1024)
+        if not response.streaming and len(response.content) < min_length:
+            return response
+        if response.has_header('Content-Encoding') or not self.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        # Pad whenever the request has a CSRF secret (sent as a cookie or
+        # generated for a rendered token); only gzip supports the padding
+        pad = 'CSRF_COOKIE' in request.META
+        encoding = compression.choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''),
+                                               allow_brotli=not pad)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.acompress_chunks(
+                    response.streaming_content, encoding, pad)
+            else:
+                response.streaming_content = compression.compress_chunks(
+                    response.streaming_content, encoding, pad)
+            del response.headers['Content-Length']
+        else:
+            compressed = compression.compress_bytes(response.content, encoding, pad)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The body changed, so a strong ETag must become weak (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def is_compressible(self, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return (content_type.startswith(self.compressible_types)
+                and not content_type.startswith(self.skipped_types))
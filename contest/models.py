@@ -1,8 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import FileExtensionValidator
 from django.utils import timezone
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, F
+from . import ranking, trending
 
 User = get_user_model()
 
@@ -70,8 +71,18 @@ class Song(models.Model):
     
     # Engagement metrics
     view_count = models.PositiveIntegerField(default=0)
+    # HyperLogLog estimate of distinct viewers, see contest.unique_viewers
+    unique_viewers = models.PositiveIntegerField(default=0)
     vote_count = models.PositiveIntegerField(default=0)
     average_rating = models.FloatField(default=0.0)
+    # Approved comments, kept current by signals; see contest.comment_feed
+    comment_count = models.PositiveIntegerField(default=0)
+    # Bayesian average maintained by contest.ranking; use it to order by rating
+    ranking_score = models.FloatField(default=0.0)
+    # Log of the time-decayed view/vote activity, see contest.trending
+    trending_score = models.FloatField(default=0.0)
+    # Votes changed since contest.recommendations last computed its neighbors
+    neighbors_stale = models.BooleanField(default=False)
     
     # Featured status
     is_featured = models.BooleanField(default=False)
@@ -79,6 +90,12 @@ class Song(models.Model):
     
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['-ranking_score'], name='song_ranking_score_idx'),
+            models.Index(fields=['-trending_score'], name='song_trending_score_idx'),
+            models.Index(fields=['id'], condition=models.Q(neighbors_stale=True),
+                         name='song_neighbors_stale_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} by {self.user.username}"
@@ -87,20 +104,31 @@ class Song(models.Model):
         return f"{self.average_rating:.1f}" if self.average_rating > 0 else "No ratings"
     
     def update_rating(self):
-        """Update average rating based on votes"""
-        votes = self.votes.all()
-        if votes.exists():
-            self.average_rating = votes.aggregate(avg=Avg('rating'))['avg'] or 0
-            self.vote_count = votes.count()
-        else:
-            self.average_rating = 0
-            self.vote_count = 0
-        self.save()
+        """Update average rating, vote count and ranking score based on votes"""
+        stats = self.votes.aggregate(avg=Avg('rating'), count=Count('id'))
+        self.average_rating = stats['avg'] or 0
+        self.vote_count = stats['count']
+        self.ranking_score = ranking.bayesian_score(self.vote_count, self.average_rating)
+        # Only the rating fields, so concurrent view and trending updates survive
+        self.save(update_fields=['average_rating', 'vote_count', 'ranking_score'])
     
     def increment_view_count(self):
-        """Increment view count"""
+        """Increment view count and feed the view into the trending score"""
+        Song.objects.filter(pk=self.pk).update(
+            view_count=F('view_count') + 1,
+            trending_score=trending.bump(trending.view_weight()),
+        )
         self.view_count += 1
-        self.save(update_fields=['view_count'])
+    
+    def save(self, *args, **kwargs):
+        # The artist's User.total_songs_uploaded is adjusted by a post_save
+        # receiver; commit both together
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
 
 class Vote(models.Model):
     RATING_CHOICES = [
@@ -123,6 +151,103 @@ class Vote(models.Model):
     
     def __str__(self):
         return f"{self.user.username} rated {self.song.title}: {self.rating} stars"
+    
+    def save(self, *args, **kwargs):
+        # The artist's User.total_votes_received is adjusted by a post_save
+        # receiver; commit both together
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
+
+class SongNeighbor(models.Model):
+    """A precomputed "listeners also rated" recommendation, see contest.recommendations"""
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Song, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    similarity = models.FloatField()
+    
+    class Meta:
+        ordering = ['song', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['song', 'rank'], name='song_neighbor_rank_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.song_id} -> {self.neighbor_id} ({self.similarity:.2f})"
+
+class SongLyrics(models.Model):
+    """Normalized lyrics text and MinHash signature, see contest.lyrics"""
+    song = models.OneToOneField(Song, on_delete=models.CASCADE, primary_key=True, related_name='lyrics')
+    text = models.TextField(blank=True)
+    signature = models.BinaryField(null=True)
+    source_name = models.CharField(max_length=255, blank=True)  # lyrics_file that was analyzed
+    error = models.CharField(max_length=255, blank=True)
+    processed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Song lyrics'
+
+    def __str__(self):
+        return f"Lyrics of {self.song_id}"
+
+class SongViewerSketch(models.Model):
+    """HyperLogLog sketch of a song's viewers on one day, or all time, see contest.unique_viewers"""
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name='viewer_sketches')
+    day = models.DateField(null=True, blank=True, help_text="Empty for the all-time sketch")
+    registers = models.BinaryField()  # zlib-compressed
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['song', 'day'], name='song_viewer_sketch_day_unique'),
+            models.UniqueConstraint(fields=['song'], condition=models.Q(day__isnull=True),
+                                    name='song_viewer_sketch_total_unique'),
+        ]
+
+    def __str__(self):
+        return f"Viewers of {self.song_id} on {self.day or 'all days'}"
+
+class LyricsBand(models.Model):
+    """One LSH bucket of a song's lyrics signature"""
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name='+')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='lyrics_band_bucket_idx'),
+        ]
+
+class LyricsMatch(models.Model):
+    """A pair of songs with near-duplicate lyrics, flagged for review"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending review'),
+        ('confirmed', 'Confirmed duplicate'),
+        ('dismissed', 'Dismissed'),
+    ]
+
+    # song has the lower id of the pair
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name='lyrics_matches')
+    other = models.ForeignKey(Song, on_delete=models.CASCADE, related_name='+')
+    similarity = models.FloatField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-similarity']
+        verbose_name_plural = 'Lyrics matches'
+        constraints = [
+            models.UniqueConstraint(fields=['song', 'other'], name='lyrics_match_pair_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['status', '-similarity'], name='lyrics_match_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.song_id} ~ {self.other_id} ({self.similarity:.0%})"
 
 class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
@@ -133,9 +258,23 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a song's approved comments, see contest.comment_feed
+            models.Index(fields=['song', '-created_at', '-id'], condition=models.Q(is_approved=True),
+                         name='comment_feed_idx'),
+        ]
     
     def __str__(self):
         return f"Comment by {self.user.username} on {self.song.title}"
+    
+    def save(self, *args, **kwargs):
+        # Song.comment_count is adjusted by a post_save receiver; commit both together
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
 
 class Winner(models.Model):
     song = models.OneToOneField(Song, on_delete=models.CASCADE, related_name='winner_info')
@@ -186,9 +325,15 @@ class Deadline(models.Model):
     
     @classmethod
     def get_current_phase(cls):
-        """Get the current active contest phase"""
-        from django.utils import timezone
-        return cls.objects.filter(deadline_date__gte=timezone.now()).order_by('deadline_date').first()
+        """Get the current active contest phase (cached, see contest.site_stats)"""
+        from .site_stats import current_phase
+        return current_phase()
+    
+    @classmethod
+    async def aget_current_phase(cls):
+        """Async version of get_current_phase()"""
+        from .site_stats import acurrent_phase
+        return await acurrent_phase()
     
     @classmethod
     def can_submit_songs(cls):
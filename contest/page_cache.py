@@ -0,0 +1,134 @@
+"""
+Anonymous full-page cache with surrogate-key invalidation.
+
+Public views opt in with the ``cache_public_page`` decorator, which tags the
+rendered response with surrogate keys such as ``song:<id>``, ``leaderboard``
+or ``phase``. ``AnonymousPageCacheMiddleware`` stores tagged responses for
+visitors without a session cookie and serves them on later requests.
+
+Every surrogate key has a version counter in the cache. An entry remembers
+the versions of its keys when it was stored and is only served while they
+still match, so ``purge('song:42')`` invalidates exactly the pages tagged
+with that song in O(1), across every worker sharing the cache backend.
+"""
+import hashlib
+import time
+from functools import wraps
+from inspect import iscoroutinefunction
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = 'pagecache'
+
+
+def get_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 300)
+
+
+def normalize_query_string(query_string):
+    """Sort parameters and drop empty ones so equivalent URLs share an entry"""
+    params = [(k, v) for k, v in parse_qsl(query_string) if v != '']
+    return urlencode(sorted(params))
+
+
+def page_key(request):
+    raw = f"{request.path}?{normalize_query_string(request.META.get('QUERY_STRING', ''))}"
+    return f"{KEY_PREFIX}:page:{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+
+def version_key(surrogate_key):
+    return f"{KEY_PREFIX}:version:{surrogate_key}"
+
+
+def get_versions(surrogate_keys):
+    """Return the current version of each surrogate key (0 if never purged)"""
+    keys = {version_key(k): k for k in surrogate_keys}
+    found = get_cache().get_many(list(keys))
+    return {name: found.get(vkey, 0) for vkey, name in keys.items()}
+
+
+def purge(*surrogate_keys):
+    """Invalidate every cached page tagged with any of the given keys"""
+    cache = get_cache()
+    for surrogate_key in surrogate_keys:
+        key = version_key(surrogate_key)
+        # Versions never expire; a missing version means "0", so start at 1
+        if not cache.add(key, 1, timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, timeout=None)
+
+
+def cache_public_page(*surrogate_keys, timeout=None, on_hit=None):
+    """
+    Mark a view as cacheable for anonymous visitors.
+
+    Surrogate keys may reference the view's URL kwargs, e.g. ``'song:{song_id}'``.
+    ``on_hit`` is called as ``on_hit(request, **kwargs)`` when the middleware
+    serves the page from cache, for side effects such as view counting.
+    """
+    def tag(response, kwargs):
+        if response.status_code == 200:
+            response.surrogate_keys = [key.format(**kwargs) for key in surrogate_keys]
+            response.page_cache_timeout = timeout
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                return tag(await view_func(request, *args, **kwargs), kwargs)
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                return tag(view_func(request, *args, **kwargs), kwargs)
+        wrapper.on_page_cache_hit = on_hit
+        return wrapper
+    return decorator
+
+
+def is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # Anything carrying per-visitor state (a session or pending flash
+    # messages) must be rendered for that visitor.
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+    if getattr(settings, 'MESSAGE_COOKIE_NAME', 'messages') in request.COOKIES:
+        return False
+    return True
+
+
+def store(request, response):
+    """Store a rendered response along with its surrogate key versions"""
+    surrogate_keys = getattr(response, 'surrogate_keys', None)
+    if not surrogate_keys or response.streaming or response.cookies:
+        return None
+    content = response.content
+    entry = {
+        'content': content,
+        'status': response.status_code,
+        'headers': [(k, v) for k, v in response.items() if k.lower() not in ('etag', 'last-modified')],
+        'etag': '"%s"' % hashlib.md5(content).hexdigest(),
+        'last_modified': time.time(),
+        'versions': get_versions(surrogate_keys),
+    }
+    get_cache().set(page_key(request), entry, response.page_cache_timeout or get_timeout())
+    return entry
+
+
+def lookup(request):
+    """Return a stored entry for this request if none of its keys were purged"""
+    entry = get_cache().get(page_key(request))
+    if entry is None:
+        return None
+    if get_versions(entry['versions']) != entry['versions']:
+        return None
+    return entry
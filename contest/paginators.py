@@ -0,0 +1,51 @@
+"""
+Paginator for admin changelists over large tables.
+
+``Paginator.count`` runs ``SELECT COUNT(*)``, which on a big table costs a
+full scan on every changelist page. For an unfiltered queryset
+``EstimatedCountPaginator`` asks the database for its row estimate instead:
+``pg_class.reltuples`` on PostgreSQL, and on SQLite the row count ANALYZE
+stores in ``sqlite_stat1`` or, failing that, the highest primary key. Only
+when the estimate is small, or the queryset is filtered (search, list
+filters), is the exact count taken.
+"""
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+# Below this many rows an exact COUNT(*) is cheap enough
+EXACT_COUNT_LIMIT = 10000
+
+
+def estimate_rows(model, using):
+    """Rough row count of the model's table, or None if the database can't tell"""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            try:
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+                row = cursor.fetchone()
+            except DatabaseError:
+                row = None  # ANALYZE has never run
+            if row:
+                return int(row[0].split()[0])
+            return model._base_manager.using(using).order_by('-pk').values_list('pk', flat=True).first() or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimate_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
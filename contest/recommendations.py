@@ -0,0 +1,132 @@
+"""
+"Listeners also rated" recommendations from item-item cosine similarity.
+
+Votes form a sparse user x song rating matrix. Each song's column is scaled
+to unit length, so the product of two columns is their cosine similarity,
+and the ``RECOMMENDATION_NEIGHBORS`` most similar songs are stored per song
+in ``SongNeighbor``. The detail page then reads them with one indexed query.
+
+``manage.py refresh_recommendations`` recomputes only what can have changed:
+songs whose votes changed (``Song.neighbors_stale``, set by the vote
+signals), songs sharing a voter with them, and songs that currently list
+them as a neighbor. ``--full`` recomputes every song.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .models import Song, SongNeighbor, Vote
+
+BATCH_SIZE = 500
+
+
+def neighbor_count():
+    return getattr(settings, 'RECOMMENDATION_NEIGHBORS', 6)
+
+
+def similar_songs(song_id, limit=None):
+    """Recommended songs for a detail page, most similar first"""
+    return (SongNeighbor.objects
+            .filter(song_id=song_id)
+            .select_related('neighbor__user')
+            .order_by('rank')[:limit or neighbor_count()])
+
+
+def build_matrix():
+    """
+    Return (normalized user x song CSR matrix, song ids by column,
+    column by song id). Songs without votes have no column.
+    """
+    # Only the batch job needs SciPy; keep it out of the request path
+    import numpy as np
+    from scipy import sparse
+
+    votes = np.array(list(Vote.objects.values_list('user_id', 'song_id', 'rating')
+                          .iterator(chunk_size=5000)), dtype=np.int64).reshape(-1, 3)
+    user_ids, rows = np.unique(votes[:, 0], return_inverse=True)
+    song_ids, columns = np.unique(votes[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (votes[:, 2].astype(np.float32), (rows, columns)),
+        shape=(len(user_ids), len(song_ids)),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0))).ravel()
+    normalized = (matrix @ sparse.diags(1 / np.where(norms > 0, norms, 1))).tocsc()
+    return normalized, song_ids, {song_id: column for column, song_id in enumerate(song_ids.tolist())}
+
+
+def top_neighbors(normalized, columns, k):
+    """Yield (column, [(neighbor column, similarity)]) for each column in ``columns``"""
+    import numpy as np
+
+    similarities = (normalized[:, columns].T @ normalized).tocsr()
+    for row, column in enumerate(columns):
+        start, end = similarities.indptr[row], similarities.indptr[row + 1]
+        candidates = similarities.indices[start:end]
+        scores = similarities.data[start:end]
+        keep = candidates != column
+        candidates, scores = candidates[keep], scores[keep]
+        if len(scores) > k:
+            best = np.argpartition(-scores, k)[:k]
+            candidates, scores = candidates[best], scores[best]
+        order = np.argsort(-scores, kind='stable')
+        yield column, list(zip(candidates[order].tolist(), scores[order].tolist()))
+
+
+def affected_songs(normalized, song_ids, column_of, stale_ids):
+    """Stale songs plus every song whose neighbor list they can have changed"""
+    import numpy as np
+
+    affected = set(stale_ids)
+    stale_columns = [column_of[song_id] for song_id in stale_ids if song_id in column_of]
+    if stale_columns:
+        # Songs sharing at least one voter with a stale song
+        overlap = (normalized[:, stale_columns].T @ normalized).tocsc()
+        affected.update(song_ids[np.unique(overlap.indices)].tolist())
+    # Songs that list a stale song now, in case a deleted vote removed the overlap
+    affected.update(SongNeighbor.objects.filter(neighbor_id__in=stale_ids)
+                    .values_list('song_id', flat=True))
+    return affected
+
+
+def refresh(full=False, k=None):
+    """Recompute neighbor lists; returns the ids of the songs refreshed"""
+    k = k or neighbor_count()
+    stale_ids = list(Song.objects.filter(neighbors_stale=True).values_list('id', flat=True))
+    if not full and not stale_ids:
+        return set()
+    # Clear the flags first so votes arriving during the run flag their
+    # songs again for the next one
+    Song.objects.filter(id__in=stale_ids).update(neighbors_stale=False)
+
+    try:
+        if Vote.objects.exists():
+            normalized, song_ids, column_of = build_matrix()
+        else:
+            normalized, song_ids, column_of = None, [], {}
+
+        if full:
+            affected = set(Song.objects.values_list('id', flat=True))
+        elif normalized is not None:
+            affected = affected_songs(normalized, song_ids, column_of, stale_ids)
+        else:
+            affected = set(stale_ids)
+
+        affected = sorted(affected)
+        for start in range(0, len(affected), BATCH_SIZE):
+            batch = affected[start:start + BATCH_SIZE]
+            columns = [column_of[song_id] for song_id in batch if song_id in column_of]
+            rows = []
+            if columns:
+                for column, neighbors in top_neighbors(normalized, columns, k):
+                    rows.extend(
+                        SongNeighbor(song_id=int(song_ids[column]), neighbor_id=int(song_ids[neighbor]),
+                                     rank=rank, similarity=similarity)
+                        for rank, (neighbor, similarity) in enumerate(neighbors, start=1)
+                    )
+            with transaction.atomic():
+                SongNeighbor.objects.filter(song_id__in=batch).delete()
+                SongNeighbor.objects.bulk_create(rows)
+    except Exception:
+        Song.objects.filter(id__in=stale_ids).update(neighbors_stale=True)
+        raise
+
+    return set(affected)
@@ -1,9 +1,17 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Winner, Song
+from .models import Winner, Song, Vote, Comment, Deadline, Tag
+from . import comment_feed, fragment_cache, live, lyrics, page_cache, site_stats
 from email_verification.services import EmailVerificationService
 import logging
 
+User = get_user_model()
 logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Winner)
@@ -44,3 +52,267 @@ def update_song_winner_status(sender, instance, **kwargs):
             
     except Exception as e:
         logger.error(f"Error updating song winner status: {str(e)}")
+
+
+# User statistics counters
+#
+# User.total_songs_uploaded and User.total_votes_received are adjusted in
+# place with F() expressions. Song and Vote save() and delete() run in a
+# transaction, so the counters commit with the row that changed them.
+# `python manage.py reconcile_user_stats` recomputes both from scratch if
+# they ever drift.
+
+def adjust_user_stats(user_filter, **deltas):
+    """Add ``deltas`` to the counters of the users matching ``user_filter``"""
+    User.objects.filter(**user_filter).update(**{
+        field: Greatest(F(field) + delta, 0) for field, delta in deltas.items() if delta
+    })
+
+@receiver(post_init, sender=Song)
+@receiver(post_init, sender=Vote)
+def remember_loaded_owner(sender, instance, **kwargs):
+    """Remember the owner the row was loaded with, to spot reassignments"""
+    # Read __dict__ directly so a deferred field doesn't cost a query
+    field = 'user_id' if sender is Song else 'song_id'
+    instance._loaded_owner_id = instance.__dict__.get(field)
+
+@receiver(post_save, sender=Song)
+def count_song_upload(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        adjust_user_stats({'pk': instance.user_id}, total_songs_uploaded=1)
+    elif instance._loaded_owner_id not in (None, instance.user_id) \
+            and (update_fields is None or {'user', 'user_id'} & set(update_fields)):
+        # Song moved to another artist; its votes go with it
+        votes = instance.votes.count()
+        adjust_user_stats({'pk': instance._loaded_owner_id},
+                          total_songs_uploaded=-1, total_votes_received=-votes)
+        adjust_user_stats({'pk': instance.user_id},
+                          total_songs_uploaded=1, total_votes_received=votes)
+    instance._loaded_owner_id = instance.user_id
+
+@receiver(post_delete, sender=Song)
+def uncount_song_upload(sender, instance, **kwargs):
+    # The song's votes are deleted first and uncount themselves
+    adjust_user_stats({'pk': instance.user_id}, total_songs_uploaded=-1)
+
+@receiver(post_save, sender=Vote)
+def count_vote_received(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        adjust_user_stats({'songs': instance.song_id}, total_votes_received=1)
+    elif instance._loaded_owner_id not in (None, instance.song_id) \
+            and (update_fields is None or {'song', 'song_id'} & set(update_fields)):
+        adjust_user_stats({'songs': instance._loaded_owner_id}, total_votes_received=-1)
+        adjust_user_stats({'songs': instance.song_id}, total_votes_received=1)
+    instance._loaded_owner_id = instance.song_id
+
+@receiver(post_delete, sender=Vote)
+def uncount_vote_received(sender, instance, **kwargs):
+    adjust_user_stats({'songs': instance.song_id}, total_votes_received=-1)
+
+
+# Song comment counts
+#
+# Song.comment_count counts approved comments. Like the user counters it is
+# adjusted with F() expressions; Comment.save() and delete() run in a
+# transaction so the count commits with the comment. `python manage.py
+# reconcile_comment_counts` recomputes it from scratch.
+
+def adjust_comment_count(song_id, delta):
+    Song.objects.filter(pk=song_id).update(comment_count=Greatest(F('comment_count') + delta, 0))
+
+def counted_song_id(song_id, is_approved):
+    """The song a comment in this state counts towards, if any"""
+    return song_id if is_approved else None
+
+@receiver(post_init, sender=Comment)
+def remember_counted_song(sender, instance, **kwargs):
+    # Read __dict__ directly so a deferred field doesn't cost a query
+    instance._counted_song_id = counted_song_id(instance.__dict__.get('song_id'),
+                                                instance.__dict__.get('is_approved'))
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None \
+            and not {'song', 'song_id', 'is_approved'} & set(update_fields):
+        return
+    before = None if created else instance._counted_song_id
+    after = counted_song_id(instance.song_id, instance.is_approved)
+    if before != after:
+        if before is not None:
+            adjust_comment_count(before, -1)
+        if after is not None:
+            adjust_comment_count(after, 1)
+    instance._counted_song_id = after
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    if instance._counted_song_id is not None:
+        adjust_comment_count(instance._counted_song_id, -1)
+
+
+# Recommendations
+
+@receiver(post_save, sender=Vote)
+@receiver(post_delete, sender=Vote)
+def flag_song_neighbors(sender, instance, **kwargs):
+    """Have the next refresh_recommendations run recompute this song's neighbors"""
+    Song.objects.filter(pk=instance.song_id, neighbors_stale=False).update(neighbors_stale=True)
+
+
+# Lyrics analysis
+
+@receiver(post_save, sender=Song)
+def schedule_lyrics_analysis(sender, instance, update_fields=None, **kwargs):
+    """Extract and fingerprint the lyrics once the upload has committed"""
+    if not getattr(settings, 'LYRICS_ANALYSIS_ON_SAVE', True):
+        return
+    if update_fields is not None and 'lyrics_file' not in update_fields:
+        return
+    transaction.on_commit(lambda: lyrics.schedule(instance.pk))
+
+
+# Page cache invalidation
+#
+# Purges and card bumps wait for the change to commit. Run any earlier and a
+# request arriving before the commit would render the old rows and cache
+# them under the new version. The keys are worked out straight away, since a
+# deleted instance has lost its pk by the time the transaction commits.
+
+def purge_on_commit(*surrogate_keys):
+    transaction.on_commit(lambda: page_cache.purge(*surrogate_keys))
+
+def bump_on_commit(*song_ids):
+    transaction.on_commit(lambda: fragment_cache.bump(*song_ids))
+
+@receiver(post_save, sender=Song)
+@receiver(post_delete, sender=Song)
+def purge_song_pages(sender, instance, update_fields=None, **kwargs):
+    """Purge cached pages showing this song"""
+    # Plain view counting is not worth throwing away every listing page
+    if update_fields is not None and set(update_fields) <= {'view_count'}:
+        return
+    purge_on_commit(f'song:{instance.pk}', 'songs', 'leaderboard')
+
+@receiver(m2m_changed, sender=Song.tags.through)
+def purge_song_tag_pages(sender, instance, action, **kwargs):
+    """Purge cached pages when a song's tags change"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if isinstance(instance, Song):
+            purge_on_commit(f'song:{instance.pk}', 'songs')
+        else:
+            purge_on_commit('songs')
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def purge_tag_pages(sender, instance, **kwargs):
+    purge_on_commit('songs')
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    purge_on_commit(f'song:{instance.song_id}', 'songs')
+
+@receiver(post_save, sender=Winner)
+@receiver(post_delete, sender=Winner)
+def purge_winner_pages(sender, instance, **kwargs):
+    purge_on_commit('winners', f'song:{instance.song_id}', 'songs')
+
+@receiver(post_save, sender=Deadline)
+@receiver(post_delete, sender=Deadline)
+def purge_phase_pages(sender, instance, **kwargs):
+    purge_on_commit('phase')
+
+
+# Song card fragment cache
+
+@receiver(post_save, sender=Song)
+def bump_song_card(sender, instance, update_fields=None, **kwargs):
+    # View counts are allowed to lag by SONG_CARD_CACHE_TIMEOUT
+    if update_fields is not None and set(update_fields) <= {'view_count'}:
+        return
+    bump_on_commit(instance.pk)
+
+@receiver(post_save, sender=Vote)
+@receiver(post_delete, sender=Vote)
+@receiver(post_save, sender=Winner)
+@receiver(post_delete, sender=Winner)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_related_song_card(sender, instance, **kwargs):
+    bump_on_commit(instance.song_id)
+
+@receiver(m2m_changed, sender=Song.tags.through)
+def bump_tagged_song_cards(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('pre_clear', 'post_add', 'post_remove'):
+        return
+    if not reverse:
+        bump_on_commit(instance.pk)
+    elif action == 'pre_clear':
+        # The song ids are gone by post_clear
+        bump_on_commit(*instance.song_set.values_list('pk', flat=True))
+    else:
+        bump_on_commit(*pk_set)
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def bump_tag_song_cards(sender, instance, **kwargs):
+    """A renamed, recoloured or deleted tag changes every card showing it"""
+    bump_on_commit(*instance.song_set.values_list('pk', flat=True))
+
+@receiver(post_save, sender=User)
+def bump_artist_song_cards(sender, instance, created, update_fields=None, **kwargs):
+    """Cards show the artist's display name"""
+    if created or (update_fields is not None
+                   and not {'username', 'first_name', 'last_name'} & set(update_fields)):
+        return
+    bump_on_commit(*instance.songs.values_list('pk', flat=True))
+
+
+# SQLite connection setup
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+
+
+# Site stats cache
+
+@receiver(post_save, sender=Deadline)
+@receiver(post_delete, sender=Deadline)
+def forget_current_phase(sender, instance, **kwargs):
+    site_stats.forget_current_phase()
+
+
+# Live feed events
+
+@receiver(post_save, sender=Song)
+def publish_song_rating(sender, instance, created, update_fields=None, **kwargs):
+    """Push the song's current rating to its live feed and the leaderboard feed"""
+    if created or (update_fields is not None and set(update_fields) <= {'view_count'}):
+        return
+    event = {
+        'type': 'rating',
+        'key': f'rating:{instance.pk}',
+        'song_id': instance.pk,
+        'title': instance.title,
+        'average_rating': round(instance.average_rating, 2),
+        'vote_count': instance.vote_count,
+    }
+    transaction.on_commit(lambda: live.publish(f'song:{instance.pk}', event))
+    transaction.on_commit(lambda: live.publish('leaderboard', event))
+
+@receiver(post_save, sender=Comment)
+def publish_comment(sender, instance, **kwargs):
+    """Push newly approved comments to the song's live feed"""
+    if not instance.is_approved:
+        return
+    event = {
+        'type': 'comment',
+        'key': f'comment:{instance.pk}',
+        **comment_feed.as_json(instance),
+    }
+    transaction.on_commit(lambda: live.publish(f'song:{instance.song_id}', event))
@@ -0,0 +1,92 @@
+"""
+Short-lived caches for the current contest phase and the site totals.
+
+Nearly every page asks for the current phase, and the home page counts
+songs, participants and votes on every render for signed-in visitors.
+Both are cached in the default cache; the phase entry is dropped whenever a
+Deadline changes (see contest.signals) and never outlives the deadline it
+holds, so a phase still ends on time.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+PHASE_KEY = 'stats:current_phase'
+TOTALS_KEY = 'stats:totals'
+
+
+def get_timeout():
+    return getattr(settings, 'SITE_STATS_CACHE_TIMEOUT', 60)
+
+
+def active_phases():
+    from .models import Deadline
+    return Deadline.objects.filter(deadline_date__gte=timezone.now()).order_by('deadline_date')
+
+
+def phase_timeout(phase):
+    if phase is None:
+        return get_timeout()
+    remaining = (phase.deadline_date - timezone.now()).total_seconds()
+    return max(0, min(get_timeout(), int(remaining)))
+
+
+def current_phase():
+    # Wrapped in a tuple so "no active phase" is cached too
+    cached = cache.get(PHASE_KEY)
+    if cached is not None:
+        return cached[0]
+    phase = active_phases().first()
+    cache.set(PHASE_KEY, (phase,), phase_timeout(phase))
+    return phase
+
+
+async def acurrent_phase():
+    cached = await cache.aget(PHASE_KEY)
+    if cached is not None:
+        return cached[0]
+    phase = await active_phases().afirst()
+    await cache.aset(PHASE_KEY, (phase,), phase_timeout(phase))
+    return phase
+
+
+def forget_current_phase():
+    cache.delete(PHASE_KEY)
+
+
+def load_totals():
+    from .models import Song, Vote
+    return {
+        'total_submissions': Song.objects.count(),
+        'total_participants': Song.objects.values('user').distinct().count(),
+        'total_votes': Vote.objects.count(),
+    }
+
+
+def site_totals():
+    """Song, participant and vote counts for the home page"""
+    totals = cache.get(TOTALS_KEY)
+    if totals is None:
+        totals = load_totals()
+        cache.set(TOTALS_KEY, totals, get_timeout())
+    return totals
+
+
+async def asite_totals():
+    from .models import Song, Vote
+    totals = await cache.aget(TOTALS_KEY)
+    if totals is None:
+        totals = {
+            'total_submissions': await Song.objects.acount(),
+            'total_participants': await Song.objects.values('user').distinct().acount(),
+            'total_votes': await Vote.objects.acount(),
+        }
+        await cache.aset(TOTALS_KEY, totals, get_timeout())
+    return totals
+
+
+def prime():
+    """Fill both caches, e.g. before a fresh worker takes traffic"""
+    forget_current_phase()
+    current_phase()
+    cache.set(TOTALS_KEY, load_totals(), get_timeout())
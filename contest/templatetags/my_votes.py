@@ -0,0 +1,16 @@
+"""
+The visitor's own ratings, see contest.user_votes.
+
+    {% load my_votes %}
+    {% with rating=user_votes|rating_for:song.id %}...{% endwith %}
+"""
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def rating_for(user_votes, song_id):
+    if not user_votes:
+        return None
+    return user_votes.get(song_id)
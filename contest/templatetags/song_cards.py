@@ -0,0 +1,17 @@
+"""
+Cached song cards, see contest.fragment_cache.
+
+    {% load song_cards %}
+    {% for song in page_obj %}{% cache_song_card song %}{% endfor %}
+"""
+from django import template
+from django.utils.safestring import mark_safe
+
+from contest import fragment_cache
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cache_song_card(context, song, template_name=fragment_cache.DEFAULT_TEMPLATE):
+    return mark_safe(fragment_cache.render_song_card(song, template_name, context.get('user_votes')))
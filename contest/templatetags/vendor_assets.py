@@ -0,0 +1,33 @@
+"""
+Tags for self-hosted vendor assets, see contest.vendor.
+
+    {% load vendor_assets %}
+    {% vendor_preloads %}
+    {% vendor_stylesheet 'bootstrap' %}
+    {% vendor_script 'bootstrap' %}
+"""
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from contest import vendor
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_stylesheet(package, key='css'):
+    return format_html('<link href="{}" rel="stylesheet">', vendor.asset_url(package, key))
+
+
+@register.simple_tag
+def vendor_script(package, key='js'):
+    return format_html('<script src="{}"></script>', vendor.asset_url(package, key))
+
+
+@register.simple_tag
+def vendor_preloads():
+    """Preload hints for vendored fonts, so they download alongside the CSS that needs them"""
+    return format_html_join(
+        '\n', '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>',
+        ((url,) for url in vendor.preload_urls()),
+    )
@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import exports, fragment_cache, page_cache, paginators, vendor
+from .models import Comment, Song, Vote, Winner
+from .paginators import EstimatedCountPaginator
+
+User = get_user_model()
+
+
+def make_songs(count, start=0):
+    """Songs, each with a vote, a comment and a winner row, by distinct artists"""
+    songs = []
+    for i in range(start, start + count):
+        artist = User.objects.create(username=f'artist{i}', email=f'artist{i}@example.com')
+        fan = User.objects.create(username=f'fan{i}', email=f'fan{i}@example.com')
+        song = Song.objects.create(
+            user=artist, title=f'Song {i}', language='urdu', genre='pop', ai_tool_used='Suno',
+            audio_file=f'songs/audio/{i}.mp3', lyrics_file=f'songs/lyrics/{i}.txt',
+        )
+        Vote.objects.create(user=fan, song=song, rating=4)
+        Comment.objects.create(user=fan, song=song, content='Nice')
+        Winner.objects.create(song=song)
+        songs.append(song)
+    return songs
+
+
+# The manifest storage has no manifest until collectstatic runs
+@override_settings(LYRICS_ANALYSIS_ON_SAVE=False, AVATAR_RENDITIONS_ON_SAVE=False,
+                   EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                   STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class AdminChangelistQueryCountTests(TestCase):
+    """Changelists must cost the same number of queries however many rows they list"""
+
+    # The user, then the rows and their count; the EstimatedCountPaginator
+    # changelists first ask SQLite for an estimate (sqlite_stat1, max pk)
+    CHANGELISTS = {
+        'song': 5,
+        'vote': 5,
+        'comment': 5,
+        'winner': 3,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assert_changelist_queries(self):
+        for model, queries in self.CHANGELISTS.items():
+            with self.subTest(model=model), self.assertNumQueries(queries):
+                response = self.client.get(f'/admin/contest/{model}/')
+                self.assertEqual(response.status_code, 200)
+
+    def test_constant_queries(self):
+        make_songs(12)
+        self.assert_changelist_queries()
+        make_songs(36, start=12)
+        self.assert_changelist_queries()
+
+
+@override_settings(LYRICS_ANALYSIS_ON_SAVE=False, AVATAR_RENDITIONS_ON_SAVE=False,
+                   EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EstimatedCountPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        make_songs(12)
+
+    def test_small_table_is_counted_exactly(self):
+        paginator = EstimatedCountPaginator(Song.objects.all(), 10)
+        with self.assertNumQueries(3):  # sqlite_stat1, max pk, then COUNT(*)
+            self.assertEqual(paginator.count, 12)
+
+    def test_large_table_uses_estimate(self):
+        estimate = paginators.EXACT_COUNT_LIMIT + 1
+        paginator = EstimatedCountPaginator(Song.objects.all(), 10)
+        with mock.patch.object(paginators, 'estimate_rows', return_value=estimate), \
+                self.assertNumQueries(0):
+            self.assertEqual(paginator.count, estimate)
+
+    def test_estimate_from_sqlite(self):
+        with mock.patch.object(paginators, 'EXACT_COUNT_LIMIT', 5):
+            paginator = EstimatedCountPaginator(Song.objects.all(), 10)
+            # Without ANALYZE statistics the highest primary key stands in
+            self.assertEqual(paginator.count, Song.objects.order_by('-pk').first().pk)
+
+    def test_filtered_queryset_is_counted_exactly(self):
+        paginator = EstimatedCountPaginator(Song.objects.filter(title__startswith='Song 1'), 10)
+        with mock.patch.object(paginators, 'estimate_rows', return_value=10 ** 6) as estimate_rows:
+            self.assertEqual(paginator.count, 3)  # Song 1, Song 10, Song 11
+        estimate_rows.assert_not_called()
+
+
+@override_settings(LYRICS_ANALYSIS_ON_SAVE=False, AVATAR_RENDITIONS_ON_SAVE=False,
+                   EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class ExportTests(TestCase):
+    TITLE = "=cmd|' /C calc'!A0"
+
+    @classmethod
+    def setUpTestData(cls):
+        song, = make_songs(1)
+        song.title = cls.TITLE
+        song.ai_tool_used = '@SUM(1+1)'
+        song.save()
+
+    def export(self, fmt):
+        return b''.join(exports.stream('songs', fmt)).decode()
+
+    def test_csv_defuses_formulas(self):
+        song, = csv.DictReader(io.StringIO(self.export('csv')))
+        self.assertEqual(song['title'], "'" + self.TITLE)
+        self.assertEqual(song['ai_tool_used'], "'@SUM(1+1)")
+        self.assertEqual(song['artist'], 'artist0')
+
+    def test_jsonl_is_raw(self):
+        song = json.loads(self.export('jsonl'))
+        self.assertEqual(song['title'], self.TITLE)
+
+
+class FontAwesomeSubsetTests(SimpleTestCase):
+    CSS = (
+        '.fa-music:before{content:"\\f001"}'
+        '.fa-check:before,.fa-circle-check:before{content:"\\f00c"}'
+        '.fa-times:before,.fa-xmark:before{content:"\\f00d"}'
+        '.fa-heart:before{content:"\\f004"}'
+        '@font-face{font-family:"Font Awesome 6 Free";font-weight:900;'
+        'src:url(../webfonts/fa-solid-900.woff2) format("woff2"),'
+        'url(../webfonts/fa-solid-900.ttf) format("truetype")}'
+        '@font-face{font-family:"Font Awesome 6 Brands";font-weight:400;'
+        'src:url(../webfonts/fa-brands-400.woff2) format("woff2"),'
+        'url(../webfonts/fa-brands-400.ttf) format("truetype")}'
+    )
+
+    def test_keeps_only_used_icon_rules(self):
+        css, codepoints = vendor.subset_stylesheet(self.CSS, {'music', 'circle-check', 'times'}, set())
+        self.assertIn('.fa-music:before{content:"\\f001"}', css)
+        self.assertIn('.fa-circle-check:before{content:"\\f00c"}', css)
+        self.assertIn('.fa-times:before{content:"\\f00d"}', css)
+        self.assertNotIn('fa-check:', css)
+        self.assertNotIn('fa-xmark', css)
+        self.assertNotIn('fa-heart', css)
+        self.assertEqual(codepoints, {0xf001, 0xf00c, 0xf00d})
+
+    def test_trims_font_faces_to_vendored_woff2(self):
+        css, _ = vendor.subset_stylesheet(self.CSS, set(), {'fa-solid-900.woff2'})
+        self.assertEqual(
+            css,
+            '@font-face{font-family:"Font Awesome 6 Free";font-weight:900;'
+            'src:url(../webfonts/fa-solid-900.woff2) format("woff2")}',
+        )
+
+    def test_used_icons(self):
+        with tempfile.TemporaryDirectory() as base_dir:
+            os.makedirs(os.path.join(base_dir, 'templates', 'contest'))
+            os.makedirs(os.path.join(base_dir, 'static', 'js'))
+            with open(os.path.join(base_dir, 'templates', 'contest', 'song.html'), 'w') as f:
+                f.write('<i class="fas fa-music"></i>\n'
+                        '<i class="fas fa-{% if song.is_winner %}trophy{% else %}star{% endif %}"></i>')
+            with open(os.path.join(base_dir, 'static', 'js', 'site.js'), 'w') as f:
+                f.write("icon.className = 'fas fa-heart';")
+            with open(os.path.join(base_dir, 'templates', 'notes.txt'), 'w') as f:
+                f.write('fa-ignored')
+            with override_settings(BASE_DIR=base_dir):
+                icons = vendor.used_icons(extra=['bolt'])
+        self.assertEqual(icons, {'music', 'trophy', 'star', 'heart', 'bolt'})
+
+
+@override_settings(LYRICS_ANALYSIS_ON_SAVE=False, AVATAR_RENDITIONS_ON_SAVE=False,
+                   EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class CacheInvalidationTests(TestCase):
+    """Cached pages and cards are invalidated only once the change commits"""
+
+    def versions(self, song):
+        keys = [f'song:{song.pk}', 'songs', fragment_cache.surrogate_key(song.pk)]
+        return page_cache.get_versions(keys)
+
+    def test_vote_purges_after_commit(self):
+        song, = make_songs(1)
+        fan = User.objects.create(username='late_fan', email='late_fan@example.com')
+        before = self.versions(song)
+        with self.captureOnCommitCallbacks(execute=True):
+            Vote.objects.create(user=fan, song=song, rating=5)
+            song.update_rating()
+            self.assertEqual(self.versions(song), before)
+        after = self.versions(song)
+        self.assertTrue(all(after[key] > before[key] for key in before), (before, after))
+
+    def test_deleted_song_keys_survive_commit(self):
+        song, = make_songs(1)
+        song_id = song.pk
+        before = page_cache.get_versions([f'song:{song_id}'])
+        with self.captureOnCommitCallbacks(execute=True):
+            song.delete()
+        self.assertGreater(page_cache.get_versions([f'song:{song_id}'])[f'song:{song_id}'],
+                           before[f'song:{song_id}'])
@@ -0,0 +1,64 @@
+"""
+Time-decayed trending score for songs.
+
+A song's trending score is the sum of its view and vote events, each weighted
+by ``exp(-decay * age)``, so activity from a day ago counts half as much as
+activity now (with the default half-life). Decaying every song's score as
+time passes would mean rewriting every row; instead ``Song.trending_score``
+stores the logarithm of the score measured against a fixed epoch:
+
+    trending_score = log(sum(weight_i * exp(decay * (t_i - EPOCH))))
+
+All songs decay by the same factor, so ordering by this column is ordering by
+the decayed score at any moment, and a new event at time ``t`` is folded in
+with ``logaddexp(trending_score, log(weight) + decay * (t - EPOCH))`` inside a
+single UPDATE. Working in log space keeps the numbers small: a year of
+daily half-lives adds only ~250 to the exponent.
+"""
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def decay_rate():
+    """Per-second decay constant for the configured half-life"""
+    half_life_hours = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 24)
+    return math.log(2) / (half_life_hours * 3600)
+
+
+def event_value(weight, now=None):
+    """Log-space value of one event of ``weight`` happening at ``now``"""
+    now = now or timezone.now()
+    return math.log(weight) + decay_rate() * (now - EPOCH).total_seconds()
+
+
+def bump(weight, now=None):
+    """
+    Expression adding an event to ``trending_score``:
+    logaddexp(a, b) = max(a, b) + ln(1 + exp(-|a - b|))
+    """
+    value = Value(event_value(weight, now))
+    current = F('trending_score')
+    return Greatest(current, value) + Ln(1 + Exp(-Abs(current - value)))
+
+
+def view_weight():
+    return getattr(settings, 'TRENDING_VIEW_WEIGHT', 1.0)
+
+
+def vote_weight():
+    return getattr(settings, 'TRENDING_VOTE_WEIGHT', 5.0)
+
+
+def current_score(trending_score, now=None):
+    """The decayed score as of ``now``, for display"""
+    if not trending_score:
+        return 0.0
+    now = now or timezone.now()
+    return math.exp(trending_score - decay_rate() * (now - EPOCH).total_seconds())
@@ -0,0 +1,232 @@
+"""
+Unique listeners per song, counted with HyperLogLog.
+
+``Song.view_count`` counts every page load. To also know how many different
+people opened a song, without storing a row per (viewer, song), each song
+gets HyperLogLog sketches: 2**PRECISION one-byte registers (4 KB at the
+default precision of 12) that estimate the number of distinct viewers with
+a standard error of 1.04 / sqrt(2**PRECISION), about 1.6%, whether a song
+has ten listeners or ten million.
+
+A viewer is identified by user id when signed in, otherwise by session
+cookie, otherwise by IP address and User-Agent. The identity is hashed with
+a key derived from SECRET_KEY and only ever lands in a register as a bit
+position, so nothing about the viewer is stored.
+
+Sketches merge by taking the larger of each pair of registers, so merging
+is order-independent and idempotent. Each worker keeps the sketches for the
+views it has seen in memory and flushes them to the database every
+UNIQUE_VIEWERS_FLUSH_INTERVAL seconds on a background thread (and at
+exit), merging them into
+
+* one ``SongViewerSketch`` row per song and day, which can be unioned over
+  any date range with ``count(song_id, start, end)``, and
+* the song's all-time sketch, whose estimate is copied into
+  ``Song.unique_viewers`` for display.
+
+Registers are stored zlib-compressed; a sketch with a handful of viewers
+takes a few dozen bytes.
+"""
+import atexit
+import hashlib
+import logging
+import math
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from ai_contest.ratelimit import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+HASH_BITS = 64
+REMAINDER_BITS = HASH_BITS - PRECISION
+REMAINDER_MASK = (1 << REMAINDER_BITS) - 1
+ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+STANDARD_ERROR = 1.04 / math.sqrt(REGISTERS)
+
+_pending = {}  # (song_id, day) -> bytearray of registers
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+_executor = None
+
+
+# Sketches
+
+def empty():
+    return bytearray(REGISTERS)
+
+
+def add(registers, item_hash):
+    """Add a 64-bit hash to a sketch in place"""
+    index = item_hash >> REMAINDER_BITS
+    remainder = item_hash & REMAINDER_MASK
+    # Position of the first 1 bit in the remaining bits, counting from 1
+    rank = REMAINDER_BITS - remainder.bit_length() + 1
+    if rank > registers[index]:
+        registers[index] = rank
+
+
+def merge(*sketches):
+    """Union of sketches"""
+    merged = empty()
+    for sketch in sketches:
+        merged[:] = bytes(map(max, merged, sketch))
+    return merged
+
+
+def estimate(registers):
+    """Estimated number of distinct items added to the sketch"""
+    raw = ALPHA * REGISTERS * REGISTERS / sum(2.0 ** -r for r in registers)
+    zeros = registers.count(0)
+    if raw <= 2.5 * REGISTERS and zeros:
+        # Small range: linear counting is more accurate
+        return round(REGISTERS * math.log(REGISTERS / zeros))
+    return round(raw)
+
+
+def dumps(registers):
+    return zlib.compress(bytes(registers))
+
+
+def loads(data):
+    registers = bytearray(zlib.decompress(bytes(data)))
+    if len(registers) != REGISTERS:
+        raise ValueError(f'Sketch has {len(registers)} registers, expected {REGISTERS}')
+    return registers
+
+
+# Viewers
+
+def hash_identity(identity):
+    key = hashlib.sha256(f'unique-viewers:{settings.SECRET_KEY}'.encode()).digest()
+    digest = hashlib.blake2b(identity.encode('utf-8'), digest_size=8, key=key).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def viewer_identity(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        return f'session:{session_key}'
+    return f"ip:{get_client_ip(request)}:{request.META.get('HTTP_USER_AGENT', '')}"
+
+
+def record(request, song_id):
+    """Count ``request``'s viewer for the song; never touches the database"""
+    item_hash = hash_identity(viewer_identity(request))
+    key = (song_id, timezone.localdate())
+    with _pending_lock:
+        registers = _pending.get(key)
+        if registers is None:
+            registers = _pending[key] = empty()
+        add(registers, item_hash)
+    schedule_flush()
+
+
+# Persistence
+
+def flush_interval():
+    return getattr(settings, 'UNIQUE_VIEWERS_FLUSH_INTERVAL', 60)
+
+
+def schedule_flush():
+    """Flush on the background thread once the interval has passed"""
+    global _executor, _last_flush
+    with _pending_lock:
+        if time.monotonic() - _last_flush < flush_interval():
+            return
+        _last_flush = time.monotonic()
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='unique-viewers')
+    _executor.submit(_flush_in_background)
+
+
+def _flush_in_background():
+    try:
+        flush()
+    except Exception as e:
+        logger.error(f"Unique viewer flush failed: {str(e)}")
+    finally:
+        close_old_connections()
+
+
+def take_pending():
+    global _pending
+    with _pending_lock:
+        pending, _pending = _pending, {}
+    return pending
+
+
+def merge_into_row(song_id, day, registers):
+    """Merge registers into the stored sketch; returns the merged sketch"""
+    from .models import SongViewerSketch
+
+    rows = SongViewerSketch.objects.filter(song_id=song_id, day=day)
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                # Writing first takes the row (and on SQLite the database)
+                # write lock, so no other worker merges in between
+                if rows.update(updated_at=timezone.now()):
+                    stored = loads(rows.values_list('registers', flat=True).get())
+                    merged = merge(stored, registers)
+                    rows.update(registers=dumps(merged))
+                else:
+                    merged = registers
+                    SongViewerSketch.objects.create(song_id=song_id, day=day, registers=dumps(merged))
+                return merged
+        except IntegrityError:
+            if attempt:
+                raise  # Another worker created the row; the retry merges into it
+
+
+def flush():
+    """Write this worker's pending sketches to the database"""
+    from .models import Song
+
+    pending = take_pending()
+    by_song = {}
+    for (song_id, day), registers in pending.items():
+        by_song.setdefault(song_id, []).append(registers)
+    existing = set(Song.objects.filter(id__in=by_song).values_list('id', flat=True))
+    for (song_id, day), registers in pending.items():
+        if song_id in existing:
+            merge_into_row(song_id, day, registers)
+    for song_id in existing:
+        total = merge_into_row(song_id, None, merge(*by_song[song_id]))
+        Song.objects.filter(id=song_id).update(unique_viewers=estimate(total))
+    return len(pending)
+
+
+def count(song_id, start=None, end=None):
+    """Estimated distinct viewers of a song between two dates (inclusive)"""
+    from .models import SongViewerSketch
+
+    if start is None and end is None:
+        sketches = SongViewerSketch.objects.filter(song_id=song_id, day__isnull=True)
+    else:
+        sketches = SongViewerSketch.objects.filter(song_id=song_id, day__isnull=False)
+        if start is not None:
+            sketches = sketches.filter(day__gte=start)
+        if end is not None:
+            sketches = sketches.filter(day__lte=end)
+    return estimate(merge(*(loads(blob) for blob in sketches.values_list('registers', flat=True))))
+
+
+@atexit.register
+def _flush_at_exit():
+    if _pending:
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Unique viewer flush at exit failed: {str(e)}")
@@ -1,17 +1,22 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# Read-heavy public pages have async variants for the ASGI profile
+public_views = async_views if settings.ASYNC_VIEWS else views
 
 app_name = 'contest'
 
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', public_views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
     path('upload/', views.upload_song, name='upload_song'),
-    path('winners/', views.winners_page, name='winners'),
-    path('browse/', views.browse_songs, name='browse_songs'),
-    path('leaderboard/', views.leaderboard, name='leaderboard'),
-    path('song/<int:song_id>/', views.song_detail, name='song_detail'),
+    path('winners/', public_views.winners_page, name='winners'),
+    path('browse/', public_views.browse_songs, name='browse_songs'),
+    path('leaderboard/', public_views.leaderboard, name='leaderboard'),
+    path('song/<int:song_id>/', public_views.song_detail, name='song_detail'),
     path('song/<int:song_id>/vote/', views.vote_song, name='vote_song'),
+    path('song/<int:song_id>/comments/', public_views.song_comments, name='song_comments'),
     path('song/<int:song_id>/comment/', views.add_comment, name='add_comment'),
     path('song/<int:song_id>/edit/', views.edit_song, name='edit_song'),
     path('song/<int:song_id>/delete/', views.delete_song_request, name='delete_song_request'),
@@ -24,4 +29,15 @@ urlpatterns = [
     path('manage/songs/', views.admin_songs, name='admin_songs'),
     path('manage/winners/', views.admin_winners, name='admin_winners'),
     path('manage/deadlines/', views.admin_deadlines, name='admin_deadlines'),
+    path('manage/export/<slug:dataset>/', views.admin_export, name='admin_export'),
+    path('manage/judging-bundle/', views.admin_judging_bundle, name='admin_judging_bundle'),
 ]
+
+# Live feeds are endless async streams. Under WSGI each one would hold a
+# worker for good, so they only exist in the ASGI profile; elsewhere the
+# pages don't open them and the URLs 404.
+if settings.ASYNC_VIEWS:
+    urlpatterns += [
+        path('leaderboard/events/', async_views.leaderboard_events, name='leaderboard_events'),
+        path('song/<int:song_id>/events/', async_views.song_events, name='song_events'),
+    ]
@@ -0,0 +1,64 @@
+"""
+The signed-in user's ratings, loaded once per request.
+
+Listing pages want to mark the songs the visitor has already rated. Asking
+per card is a query per song; instead ``for_request(request)`` returns a
+``UserVotes`` map of song id -> rating for every vote the user has cast,
+fetched with a single query the first time anything looks at it and shared
+by every list on the page and the song detail view. A user has at most one
+vote per song, so the map stays small. Anonymous visitors cost no query.
+
+Templates get it as ``user_votes`` from the context processor. Async views
+must ``await aload(request)`` before rendering, since templates can't run
+queries inside the event loop.
+"""
+
+
+class UserVotes:
+
+    def __init__(self, user):
+        self.user = user
+        self._ratings = None
+
+    @property
+    def is_authenticated(self):
+        return self.user is not None and self.user.is_authenticated
+
+    def queryset(self):
+        from .models import Vote
+        return Vote.objects.filter(user=self.user).values_list('song_id', 'rating')
+
+    def load(self):
+        if self._ratings is None:
+            self._ratings = dict(self.queryset()) if self.is_authenticated else {}
+        return self._ratings
+
+    async def aload(self):
+        if self._ratings is None:
+            self._ratings = {}
+            if self.is_authenticated:
+                self._ratings = {song_id: rating async for song_id, rating in self.queryset()}
+        return self._ratings
+
+    def get(self, song_id):
+        """The user's rating of the song, or None"""
+        return self.load().get(song_id)
+
+    def __contains__(self, song_id):
+        return song_id in self.load()
+
+    def __len__(self):
+        return len(self.load())
+
+
+def for_request(request):
+    votes = getattr(request, '_user_votes', None)
+    if votes is None:
+        votes = request._user_votes = UserVotes(getattr(request, 'user', None))
+    return votes
+
+
+async def aload(request):
+    votes = for_request(request)
+    await votes.aload()
+    return votes
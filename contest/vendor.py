@@ -0,0 +1,226 @@
+"""
+Self-hosted third-party front-end assets.
+
+``static/vendor/manifest.json`` pins every vendor file we serve: where it is
+downloaded from, where it lives under ``static/vendor`` and the SHA-256 of
+the download. ``manage.py vendor_assets`` fetches the files into
+``.vendor-cache/``, verifies them against the manifest and writes the served
+copies into ``static/vendor``, from where they go through the same hashed,
+compressed WhiteNoise pipeline as our own assets.
+
+Packages marked ``"subset": true`` (meant for Font Awesome, which is not
+vendored yet) are subset on the way: only the icon rules our templates and
+scripts use are kept in the stylesheet, and the fonts are cut down to those
+glyphs (with fontTools, when installed).
+
+Templates link vendor files with the ``vendor_assets`` tags. Until a
+package has been vendored the tags fall back to its CDN URL, so a fresh
+checkout keeps working.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import urllib.request
+from functools import cache
+
+from django.conf import settings
+from django.templatetags.static import static
+
+VENDOR_DIR = os.path.join(settings.BASE_DIR, 'static', 'vendor')
+MANIFEST_PATH = os.path.join(VENDOR_DIR, 'manifest.json')
+CACHE_DIR = os.path.join(settings.BASE_DIR, '.vendor-cache')
+
+ICON_PATTERN = re.compile(r'\bfa-([a-z0-9-]+)')
+# Conditional icon names such as fa-{% if ok %}check{% else %}times{% endif %}
+DYNAMIC_ICON_PATTERN = re.compile(r'\bfa-(\{%.*?\{%\s*endif\s*%\})', re.S)
+TEMPLATE_TAG_PATTERN = re.compile(r'\{%.*?%\}')
+# One icon rule, in the 6.0 (content) or later (--fa) style
+ICON_RULE_PATTERN = re.compile(
+    r'((?:\.fa-[\w-]+(?:::?before)?,?)+)\{(content|--fa):"((?:\\[0-9a-fA-F]+|[^"\\])+)"\}'
+)
+SELECTOR_NAME_PATTERN = re.compile(r'\.fa-([\w-]+)')
+FONT_FACE_PATTERN = re.compile(r'@font-face\{[^}]*\}')
+FONT_URL_PATTERN = re.compile(r'url\(([^)]+)\)\s*format\("([^"]+)"\)')
+# The .map files aren't vendored, and collectstatic fails on a dangling reference
+SOURCE_MAP_PATTERN = re.compile(rb'\n?(?:/\*# sourceMappingURL=[^*]*\*/|//# sourceMappingURL=\S*)\s*$')
+
+
+class VendorError(Exception):
+    pass
+
+
+@cache
+def load_manifest():
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def get_file(package, key):
+    try:
+        return load_manifest()[package]['files'][key]
+    except KeyError:
+        raise VendorError(f'No vendor file {package}/{key} in {MANIFEST_PATH}')
+
+
+@cache
+def is_vendored(path):
+    return os.path.exists(os.path.join(VENDOR_DIR, path))
+
+
+def asset_url(package, key):
+    """Hashed static URL of a vendored file, or its CDN URL if not vendored yet"""
+    entry = get_file(package, key)
+    if is_vendored(entry['path']):
+        return static(f"vendor/{entry['path']}")
+    return entry['url']
+
+
+def preload_urls():
+    """Static URLs of the vendored files marked for preloading"""
+    return [
+        static(f"vendor/{entry['path']}")
+        for package in load_manifest().values()
+        for entry in package['files'].values()
+        if entry.get('preload') and is_vendored(entry['path'])
+    ]
+
+
+# Fetching
+
+def sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download(entry, refresh=False):
+    """Download a manifest entry into the cache and check its pinned hash"""
+    if not entry.get('sha256'):
+        # Trusting whatever the CDN serves first would pin a tampered file
+        raise VendorError(f"{entry['url']} has no pinned sha256 in {MANIFEST_PATH}")
+    cached = os.path.join(CACHE_DIR, hashlib.sha256(entry['url'].encode()).hexdigest()[:16],
+                          os.path.basename(entry['path']))
+    if refresh or not os.path.exists(cached):
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        with urllib.request.urlopen(entry['url'], timeout=30) as response, open(cached, 'wb') as f:
+            shutil.copyfileobj(response, f)
+    digest = sha256(cached)
+    if entry['sha256'] != digest:
+        raise VendorError(f"{entry['url']} does not match its pinned sha256 (got {digest})")
+    return cached
+
+
+def write_vendored(path, data):
+    destination = os.path.join(VENDOR_DIR, path)
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    with open(destination, mode) as f:
+        f.write(data)
+
+
+# Font Awesome subsetting
+
+def used_icons(extra=()):
+    """Icon names referenced by the templates and our own scripts"""
+    icons = set(extra)
+    roots = [os.path.join(settings.BASE_DIR, 'templates'), os.path.join(settings.BASE_DIR, 'static', 'js')]
+    for root in roots:
+        for directory, _, names in os.walk(root):
+            for name in names:
+                if not name.endswith(('.html', '.js')):
+                    continue
+                with open(os.path.join(directory, name), encoding='utf-8') as f:
+                    text = f.read()
+                icons.update(ICON_PATTERN.findall(text))
+                for dynamic in DYNAMIC_ICON_PATTERN.findall(text):
+                    icons.update(re.findall(r'[a-z0-9-]+', TEMPLATE_TAG_PATTERN.sub(' ', dynamic)))
+    return icons
+
+
+def codepoint(content):
+    if content.startswith('\\'):
+        return int(content[1:], 16)
+    return ord(content)
+
+
+def subset_stylesheet(css, icons, fonts):
+    """
+    Keep the icon rules for ``icons`` and the @font-face rules whose woff2 file
+    is in ``fonts`` (file names); returns (css, set of codepoints kept).
+    """
+    codepoints = set()
+
+    def icon_rule(match):
+        selectors = [s for s in match.group(1).split(',')
+                     if s and SELECTOR_NAME_PATTERN.match(s).group(1) in icons]
+        if not selectors:
+            return ''
+        selectors, prop, content = ','.join(selectors), match.group(2), match.group(3)
+        codepoints.add(codepoint(content))
+        return f'{selectors}{{{prop}:"{content}"}}'
+
+    def font_face(match):
+        block = match.group(0)
+        woff2 = [url for url, fmt in FONT_URL_PATTERN.findall(block) if fmt == 'woff2']
+        if not woff2 or os.path.basename(woff2[0].strip('"\'')) not in fonts:
+            return ''
+        # Only woff2 is vendored, so drop the truetype fallbacks
+        src = re.search(r'src:[^;}]*', block).group(0)
+        return block.replace(src, f'src:url({woff2[0]}) format("woff2")')
+
+    css = ICON_RULE_PATTERN.sub(icon_rule, css)
+    css = FONT_FACE_PATTERN.sub(font_face, css)
+    return css, codepoints
+
+
+def subset_font(source, codepoints):
+    """woff2 bytes of ``source`` cut down to ``codepoints``, or None without fontTools"""
+    try:
+        from fontTools import subset
+    except ImportError:
+        return None
+    options = subset.Options()
+    options.flavor = 'woff2'
+    font = subset.load_font(source, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    subset.save_font(font, out, options)
+    return out.getvalue()
+
+
+# Building
+
+def vendor_package(name, refresh=False, log=print):
+    """Fetch one package, verified against the manifest, and write its served files"""
+    package = load_manifest()[name]
+    downloads = {key: download(entry, refresh) for key, entry in package['files'].items()}
+
+    if not package.get('subset'):
+        for key, entry in package['files'].items():
+            with open(downloads[key], 'rb') as f:
+                write_vendored(entry['path'], SOURCE_MAP_PATTERN.sub(b'', f.read()))
+    else:
+        icons = used_icons(package.get('extra_icons', ()))
+        fonts = {os.path.basename(entry['path']): key
+                 for key, entry in package['files'].items() if entry['path'].endswith('.woff2')}
+        with open(downloads['css'], encoding='utf-8') as f:
+            css, codepoints = subset_stylesheet(f.read(), icons, fonts)
+        write_vendored(package['files']['css']['path'], css)
+        log(f'{name}: kept {len(codepoints)} glyphs for {len(icons)} icon names')
+        for key in fonts.values():
+            entry = package['files'][key]
+            data = subset_font(downloads[key], codepoints)
+            if data is None:
+                log(f'{name}: fontTools is not installed, vendoring the full {key} font')
+                with open(downloads[key], 'rb') as f:
+                    data = f.read()
+            write_vendored(entry['path'], data)
+
+    is_vendored.cache_clear()
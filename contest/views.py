@@ -1,26 +1,48 @@
+import os
+import random
+import string
+
+from django.conf import settings
+from django.core.mail import send_mail
 from django.shortcuts import render, redirect, get_object_or_404
 from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, F, OuterRef, Subquery
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from .models import Song, Vote, Comment, Winner, Deadline, Category, Tag
 from .forms import SongUploadForm, VoteForm, CommentForm, SongSearchForm, SongForm
 from django.contrib.auth import get_user_model
+from django.contrib.sites.shortcuts import get_current_site
 from .models import Song, Vote, Comment, Winner, Category, Tag, Deadline
 from .forms import SongUploadForm, VoteForm, CommentForm, SongSearchForm
+from email_verification.forms import EmailVerificationForm
+from email_verification.models import EmailVerification
 from email_verification.services import EmailVerificationService
+from . import comment_feed, exports, judging_bundle, lyrics, recommendations, site_stats, trending, unique_viewers, user_votes
+from .page_cache import cache_public_page
+from ai_contest.ratelimit import ratelimit
 
 User = get_user_model()
 
+def record_song_view(request, song_id):
+    """Count a view of a song page served from the page cache"""
+    Song.objects.filter(id=song_id).update(
+        view_count=F('view_count') + 1,
+        trending_score=trending.bump(trending.view_weight()),
+    )
+    unique_viewers.record(request, song_id)
+
+@cache_public_page('songs', 'winners', 'phase', timeout=60)
 def home(request):
     """Home page showing contest info and recent winners"""
     winners = Winner.objects.select_related('song__user').order_by('-selected_at')[:3]
     featured_songs = Song.objects.filter(is_featured=True).order_by('-submitted_at')[:6]
-    top_rated_songs = Song.objects.filter(average_rating__gt=0).order_by('-average_rating')[:3]
+    top_rated_songs = Song.objects.filter(vote_count__gt=0).order_by('-ranking_score')[:3]
+    trending_songs = Song.objects.select_related('user').filter(trending_score__gt=0).order_by('-trending_score')[:6]
     
     # Check and advance phases if needed
     Deadline.check_and_advance_phases()
@@ -33,11 +55,10 @@ def home(request):
         'winners': winners,
         'featured_songs': featured_songs,
         'top_rated_songs': top_rated_songs,
-        'total_submissions': Song.objects.count(),
-        'total_participants': Song.objects.values('user').distinct().count(),
-        'total_votes': Vote.objects.count(),
+        'trending_songs': trending_songs,
         'current_phase': current_phase,
         'can_submit_songs': can_submit,
+        **site_stats.site_totals(),
     }
     return render(request, 'contest/home.html', context)
 
@@ -85,10 +106,6 @@ def upload_song(request):
             song.save()
             form.save_m2m()  # Save many-to-many relationships (tags)
             
-            # Update user statistics
-            request.user.total_songs_uploaded = Song.objects.filter(user=request.user).count()
-            request.user.save(update_fields=['total_songs_uploaded'])
-            
             # Send upload confirmation email
             try:
                 EmailVerificationService.send_notification_email(
@@ -118,6 +135,7 @@ def upload_song(request):
     }
     return render(request, 'contest/upload_song.html', context)
 
+@cache_public_page('winners')
 def winners_page(request):
     """Page showing all winners"""
     winners = Winner.objects.select_related('song__user').order_by('-selected_at')
@@ -127,23 +145,20 @@ def winners_page(request):
     
     return render(request, 'contest/winners.html', {'page_obj': page_obj})
 
+@cache_public_page('song:{song_id}', on_hit=record_song_view)
 def song_detail(request, song_id):
     """View individual song details with voting and comments"""
     song = get_object_or_404(Song, id=song_id)
     
     # Increment view count
     song.increment_view_count()
+    unique_viewers.record(request, song.id)
     
-    # Get user's existing vote if any
-    user_vote = None
-    if request.user.is_authenticated:
-        try:
-            user_vote = Vote.objects.get(user=request.user, song=song)
-        except Vote.DoesNotExist:
-            pass
+    # Get user's existing rating if any
+    user_rating = user_votes.for_request(request).get(song.id)
     
-    # Get comments
-    comments = Comment.objects.filter(song=song, is_approved=True).select_related('user')[:10]
+    # Get the first page of comments
+    comments, next_cursor = comment_feed.page(song.id)
     
     # Forms
     vote_form = VoteForm()
@@ -151,8 +166,10 @@ def song_detail(request, song_id):
     
     context = {
         'song': song,
-        'user_vote': user_vote,
+        'user_rating': user_rating,
         'comments': comments,
+        'next_cursor': next_cursor,
+        'similar_songs': recommendations.similar_songs(song.id),
         'vote_form': vote_form,
         'comment_form': comment_form,
     }
@@ -160,6 +177,7 @@ def song_detail(request, song_id):
 
 @login_required
 @require_POST
+@ratelimit('vote', rate='30/m', keys=('user',))
 def vote_song(request, song_id):
     """Vote on a song"""
     song = get_object_or_404(Song, id=song_id)
@@ -177,6 +195,8 @@ def vote_song(request, song_id):
         vote.save()
         messages.success(request, 'Your vote has been updated!')
     else:
+        # New votes count towards trending; changing a rating doesn't
+        Song.objects.filter(id=song.id).update(trending_score=trending.bump(trending.vote_weight()))
         messages.success(request, 'Thank you for voting!')
     
     # Update song rating
@@ -184,6 +204,31 @@ def vote_song(request, song_id):
     
     return redirect('contest:song_detail', song_id=song.id)
 
+@cache_public_page('song:{song_id}')
+def song_comments(request, song_id):
+    """
+    A page of a song's approved comments after ``?cursor=``, as an HTML
+    fragment or, with ``?format=json``, as JSON
+    """
+    if not Song.objects.filter(id=song_id).exists():
+        raise Http404('No Song matches the given query.')
+    try:
+        comments, next_cursor = comment_feed.page(song_id, request.GET.get('cursor'))
+    except ValueError:
+        return HttpResponseBadRequest('Invalid cursor')
+    return render_comment_page(request, comments, next_cursor)
+
+def render_comment_page(request, comments, next_cursor):
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [comment_feed.as_json(comment) for comment in comments],
+            'next_cursor': next_cursor,
+        })
+    return render(request, 'contest/partials/comments.html', {
+        'comments': comments,
+        'next_cursor': next_cursor,
+    })
+
 @login_required
 @require_POST
 def add_comment(request, song_id):
@@ -202,48 +247,57 @@ def add_comment(request, song_id):
     
     return redirect('contest:song_detail', song_id=song.id)
 
+def filter_songs(songs, cleaned_data):
+    """Apply SongSearchForm filters and sorting to a Song queryset"""
+    search = cleaned_data.get('search')
+    language = cleaned_data.get('language')
+    genre = cleaned_data.get('genre')
+    sort_by = cleaned_data.get('sort_by') or 'newest'
+    
+    # Apply filters
+    if search:
+        matches = (
+            Q(title__icontains=search) |
+            Q(description__icontains=search) |
+            Q(user__username__icontains=search) |
+            Q(user__first_name__icontains=search) |
+            Q(user__last_name__icontains=search)
+        )
+        # Extracted lyrics are stored normalized, so match them the same way
+        lyrics_search = lyrics.normalize(search)
+        if lyrics_search:
+            matches |= Q(lyrics__text__icontains=lyrics_search)
+        songs = songs.filter(matches)
+    
+    if language:
+        songs = songs.filter(language=language)
+    
+    if genre:
+        songs = songs.filter(genre=genre)
+    
+    # Apply sorting
+    if sort_by == 'oldest':
+        songs = songs.order_by('submitted_at')
+    elif sort_by == 'most_voted':
+        songs = songs.order_by('-vote_count')
+    elif sort_by == 'highest_rated':
+        songs = songs.order_by('-ranking_score')
+    elif sort_by == 'most_viewed':
+        songs = songs.order_by('-view_count')
+    elif sort_by == 'trending':
+        songs = songs.order_by('-trending_score')
+    else:  # newest
+        songs = songs.order_by('-submitted_at')
+    return songs
+
+@cache_public_page('songs')
 def browse_songs(request):
     """Browse all songs with search and filtering"""
     form = SongSearchForm(request.GET)
-    songs = Song.objects.select_related('user', 'category').prefetch_related('tags')
+    songs = Song.objects.select_related('user').prefetch_related('tags')
     
     if form.is_valid():
-        search = form.cleaned_data.get('search')
-        language = form.cleaned_data.get('language')
-        genre = form.cleaned_data.get('genre')
-        category = form.cleaned_data.get('category')
-        sort_by = form.cleaned_data.get('sort_by', 'newest')
-        
-        # Apply filters
-        if search:
-            songs = songs.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(user__username__icontains=search) |
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search)
-            )
-        
-        if language:
-            songs = songs.filter(language=language)
-        
-        if genre:
-            songs = songs.filter(genre=genre)
-        
-        if category:
-            songs = songs.filter(category=category)
-        
-        # Apply sorting
-        if sort_by == 'oldest':
-            songs = songs.order_by('submitted_at')
-        elif sort_by == 'most_voted':
-            songs = songs.order_by('-vote_count')
-        elif sort_by == 'highest_rated':
-            songs = songs.order_by('-average_rating')
-        elif sort_by == 'most_viewed':
-            songs = songs.order_by('-view_count')
-        else:  # newest
-            songs = songs.order_by('-submitted_at')
+        songs = filter_songs(songs, form.cleaned_data)
     
     # Pagination
     paginator = Paginator(songs, 12)
@@ -253,25 +307,31 @@ def browse_songs(request):
     context = {
         'form': form,
         'page_obj': page_obj,
-        'total_results': songs.count(),
+        'total_results': paginator.count,
     }
     return render(request, 'contest/browse_songs.html', context)
 
+def top_artists_by_votes():
+    """Artists ordered by their maintained vote counter, with their average rating"""
+    average_rating = (Vote.objects
+                      .filter(song__user=OuterRef('pk'))
+                      .values('song__user')
+                      .annotate(avg=Avg('rating'))
+                      .values('avg'))
+    return (User.objects
+            .filter(total_votes_received__gt=0)
+            .order_by('-total_votes_received')
+            .values('username', 'first_name', 'total_songs_uploaded', 'total_votes_received')
+            .annotate(avg_rating=Subquery(average_rating)))
+
+@cache_public_page('leaderboard')
 def leaderboard(request):
     """Show leaderboard of top artists and songs"""
     # Top artists by total votes received
-    top_artists = (Song.objects
-                   .values('user__username', 'user__first_name', 'user__last_name')
-                   .annotate(
-                       total_votes=Count('votes'),
-                       avg_rating=Avg('votes__rating'),
-                       song_count=Count('id')
-                   )
-                   .filter(total_votes__gt=0)
-                   .order_by('-total_votes')[:10])
+    top_artists = top_artists_by_votes()[:10]
     
     # Top songs by rating
-    top_songs = Song.objects.filter(average_rating__gt=0).order_by('-average_rating')[:10]
+    top_songs = Song.objects.filter(vote_count__gt=0).order_by('-ranking_score')[:10]
     
     # Most viewed songs
     most_viewed = Song.objects.filter(view_count__gt=0).order_by('-view_count')[:10]
@@ -291,8 +351,6 @@ def is_admin(user):
 @user_passes_test(is_admin)
 def admin_dashboard(request):
     """Admin dashboard with overview statistics"""
-    from django.db.models import Count
-    
     total_users = User.objects.count()
     total_songs = Song.objects.count()
     total_votes = Vote.objects.count()
@@ -434,7 +492,7 @@ def admin_edit_user(request, user_id):
     user_votes = Vote.objects.filter(user=user).select_related('song').order_by('-created_at')[:10]
     
     context = {
-        'profile_user': user,
+        'user_to_edit': user,
         'user_songs': user_songs,
         'user_votes': user_votes,
     }
@@ -443,7 +501,7 @@ def admin_edit_user(request, user_id):
 @user_passes_test(is_admin)
 def admin_songs(request):
     """Admin page for managing songs"""
-    songs = Song.objects.select_related('user', 'category').prefetch_related('tags').order_by('-submitted_at')
+    songs = Song.objects.select_related('user').prefetch_related('tags').order_by('-submitted_at')
     
     # Search and filter functionality
     search = request.GET.get('search')
@@ -480,8 +538,8 @@ def admin_winners(request):
     """Admin page for managing contest winners"""
     winners = Winner.objects.select_related('song__user').order_by('-selected_at')
     
-    # Get eligible songs for winner selection (all songs, ordered by rating)
-    eligible_songs = Song.objects.all().order_by('-average_rating')[:50]
+    # Get eligible songs for winner selection (all songs, ordered by ranking score)
+    eligible_songs = Song.objects.all().order_by('-ranking_score')[:50]
     
     if request.method == 'POST':
         action = request.POST.get('action')
@@ -539,6 +597,47 @@ def admin_deadlines(request):
     }
     return render(request, 'contest/admin_deadlines.html', context)
 
+@user_passes_test(is_admin)
+def admin_export(request, dataset):
+    """Stream a dataset as CSV or JSON Lines, optionally gzipped and limited to a date range"""
+    if dataset not in exports.EXPORTS:
+        raise Http404('Unknown export.')
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in exports.FORMATS:
+        return HttpResponseBadRequest('format must be csv or jsonl.')
+    try:
+        start = exports.parse_date(request.GET.get('start'))
+        end = exports.parse_date(request.GET.get('end'))
+    except ValueError:
+        return HttpResponseBadRequest('start and end must be dates in YYYY-MM-DD format.')
+    compress = request.GET.get('gzip') in ('1', 'true')
+    
+    content_type = 'application/gzip' if compress else exports.FORMATS[fmt][0]
+    response = StreamingHttpResponse(
+        exports.stream(dataset, fmt, start, end, compress), content_type=content_type
+    )
+    filename = exports.filename(dataset, fmt, start, end, compress)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@user_passes_test(is_admin)
+def admin_judging_bundle(request):
+    """Stream a ZIP of every submission's audio and lyrics plus a manifest CSV"""
+    language = request.GET.get('language') or None
+    genre = request.GET.get('genre') or None
+    if language and language not in dict(Song.LANGUAGE_CHOICES):
+        return HttpResponseBadRequest('Unknown language.')
+    if genre and genre not in dict(Song.GENRE_CHOICES):
+        return HttpResponseBadRequest('Unknown genre.')
+    
+    songs = judging_bundle.bundle_songs(language, genre)
+    response = StreamingHttpResponse(judging_bundle.stream_bundle(songs), content_type='application/zip')
+    filename = judging_bundle.bundle_filename(language, genre)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @login_required
 def edit_song(request, song_id):
     """Edit song details (metadata only, not files)"""
@@ -562,12 +661,6 @@ def edit_song(request, song_id):
 @login_required
 def delete_song_request(request, song_id):
     """Request song deletion with email verification"""
-    from email_verification.models import EmailVerification
-    from django.core.mail import send_mail
-    from django.conf import settings
-    import random
-    import string
-    
     song = get_object_or_404(Song, id=song_id, user=request.user)
     
     if request.method == 'POST':
@@ -619,11 +712,6 @@ def delete_song_request(request, song_id):
 @login_required
 def delete_song_verify(request, song_id):
     """Verify deletion code and delete song"""
-    from email_verification.models import EmailVerification
-    from django.core.mail import send_mail
-    from django.conf import settings
-    import os
-    
     try:
         song = Song.objects.get(id=song_id, user=request.user)
     except Song.DoesNotExist:
@@ -631,7 +719,6 @@ def delete_song_verify(request, song_id):
         return redirect('contest:dashboard')
     
     if request.method == 'POST':
-        from email_verification.forms import EmailVerificationForm
         form = EmailVerificationForm(request.POST)
         if form.is_valid():
             code = form.cleaned_data['code']
@@ -683,9 +770,6 @@ def delete_song_verify(request, song_id):
                 
                 # Send confirmation email using template
                 try:
-                    from django.template.loader import render_to_string
-                    from django.contrib.sites.shortcuts import get_current_site
-                    
                     email_context = {
                         'user': request.user,
                         'song_title': song_title,
@@ -715,7 +799,6 @@ def delete_song_verify(request, song_id):
             except EmailVerification.DoesNotExist:
                 messages.error(request, 'Invalid verification code. Please try again.')
     else:
-        from email_verification.forms import EmailVerificationForm
         form = EmailVerificationForm()
     
     # Check again if song exists before rendering template
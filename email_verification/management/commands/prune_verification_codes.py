@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from email_verification.services import EmailVerificationService
+
+
+class Command(BaseCommand):
+    help = 'Delete used and expired verification codes in small batches to keep database write locks short'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of codes deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help='Seconds to sleep between batches so requests can take the write lock')
+
+    def handle(self, *args, **options):
+        total = EmailVerificationService.cleanup_expired_codes(
+            batch_size=options['batch_size'], pause=options['pause']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Deleted {total} used or expired verification codes.'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from email_verification.services import EmailVerificationService
+
+
+class Command(BaseCommand):
+    help = ('Mark all but the newest active verification code per user and type as used; '
+            'run before the migration adding one_active_verification_per_user_type')
+
+    def handle(self, *args, **options):
+        retired = EmailVerificationService.retire_duplicate_active_codes()
+        self.stdout.write(self.style.SUCCESS(f'Retired {retired} duplicate active verification codes.'))
@@ -27,6 +27,24 @@ class EmailVerification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            # At most one live code per user and purpose; a resend replaces it
+            models.UniqueConstraint(
+                fields=['user', 'verification_type'],
+                condition=models.Q(is_used=False),
+                name='one_active_verification_per_user_type',
+            ),
+        ]
+        indexes = [
+            # Partial index covering the active-code lookups in the service
+            models.Index(
+                fields=['user', 'email', 'verification_type'],
+                condition=models.Q(is_used=False),
+                name='active_verification_idx',
+            ),
+            # Lets prune_verification_codes find expired rows without a scan
+            models.Index(fields=['expires_at'], name='verification_expires_idx'),
+        ]
         
     def save(self, *args, **kwargs):
         if not self.code:
@@ -35,7 +53,8 @@ class EmailVerification(models.Model):
             self.expires_at = timezone.now() + timedelta(minutes=15)  # 15 minutes expiry
         super().save(*args, **kwargs)
     
-    def generate_code(self):
+    @staticmethod
+    def generate_code():
         """Generate a 6-digit verification code"""
         return ''.join(random.choices(string.digits, k=6))
     
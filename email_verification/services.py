@@ -2,8 +2,13 @@ from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from .models import EmailVerification
+from datetime import timedelta
 import logging
+import time
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -58,22 +63,21 @@ class EmailVerificationService:
     def send_verification_code(user, email, verification_type='registration'):
         """Send verification code to user's email"""
         try:
-            # Create or update verification record
-            verification, created = EmailVerification.objects.get_or_create(
+            # Replace the single active code for this user and purpose. The
+            # unique constraint guarantees there is at most one, and
+            # update_or_create retries the update if a concurrent resend won.
+            verification, created = EmailVerification.objects.update_or_create(
                 user=user,
-                email=email,
                 verification_type=verification_type,
                 is_used=False,
-                defaults={'attempts': 0}
+                defaults={
+                    'email': email,
+                    'code': EmailVerification.generate_code(),
+                    'attempts': 0,
+                    'expires_at': timezone.now() + timedelta(minutes=15),
+                }
             )
             
-            if not created:
-                # Reset existing verification
-                verification.code = verification.generate_code()
-                verification.attempts = 0
-                verification.is_used = False
-                verification.save()
-            
             # Prepare email content based on verification type
             if verification_type == 'password_reset':
                 subject = f'Password Reset Code - AI Song Contest'
@@ -120,17 +124,18 @@ class EmailVerificationService:
     def verify_code(user, email, code, verification_type='registration'):
         """Verify the provided code"""
         try:
+            # Single-row probe of the active code; the code itself is
+            # compared below so wrong guesses count towards the attempt limit
             verification = EmailVerification.objects.get(
                 user=user,
                 email=email,
                 verification_type=verification_type,
-                code=code,
                 is_used=False
             )
             
             # Increment attempts
             verification.attempts += 1
-            verification.save()
+            verification.save(update_fields=['attempts'])
             
             if not verification.is_valid():
                 if verification.is_expired():
@@ -140,9 +145,12 @@ class EmailVerificationService:
                 else:
                     return False, "Invalid verification code."
             
+            if not constant_time_compare(verification.code, code):
+                return False, "Invalid verification code."
+            
             # Mark as used
             verification.is_used = True
-            verification.save()
+            verification.save(update_fields=['is_used'])
             
             logger.info(f"Verification successful for {email}")
             return True, "Email verified successfully!"
@@ -154,11 +162,44 @@ class EmailVerificationService:
             return False, "An error occurred during verification."
     
     @staticmethod
-    def cleanup_expired_codes():
-        """Clean up expired verification codes"""
-        from django.utils import timezone
-        expired_count = EmailVerification.objects.filter(
-            expires_at__lt=timezone.now()
-        ).delete()[0]
-        logger.info(f"Cleaned up {expired_count} expired verification codes")
-        return expired_count
+    def cleanup_expired_codes(batch_size=1000, pause=0):
+        """
+        Delete used and expired verification codes in batches of
+        ``batch_size``, sleeping ``pause`` seconds between batches so each
+        write lock stays short.
+        """
+        now = timezone.now()
+        stale = EmailVerification.objects.filter(
+            Q(is_used=True) | Q(expires_at__lt=now)
+        ).order_by()
+        total = 0
+        while True:
+            ids = list(stale.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            total += EmailVerification.objects.filter(id__in=ids).delete()[0]
+            if len(ids) < batch_size:
+                break
+            time.sleep(pause)
+        logger.info(f"Cleaned up {total} expired verification codes")
+        return total
+    
+    @staticmethod
+    def retire_duplicate_active_codes():
+        """
+        Mark every active code except the newest per user and verification
+        type as used, so the one_active_verification_per_user_type
+        constraint can be added to a database filled by the old per-email
+        get_or_create. Returns the number of codes retired.
+        """
+        newer = EmailVerification.objects.filter(
+            user=OuterRef('user'),
+            verification_type=OuterRef('verification_type'),
+            is_used=False,
+        ).filter(
+            Q(created_at__gt=OuterRef('created_at'))
+            | Q(created_at=OuterRef('created_at'), id__gt=OuterRef('id'))
+        )
+        retired = EmailVerification.objects.filter(is_used=False).filter(Exists(newer)).update(is_used=True)
+        logger.info(f"Retired {retired} duplicate active verification codes")
+        return retired
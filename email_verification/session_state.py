@@ -0,0 +1,37 @@
+"""
+Session helpers for multi-step verification flows.
+
+Each flow (email verification, password reset, username recovery) keeps its
+state under a single session key instead of several loose keys. Starting,
+updating or finishing a flow is one assignment, and unchanged state is never
+re-assigned, so the session is only marked modified (and written back to the
+session store) when something actually changed.
+"""
+
+EMAIL_VERIFICATION = 'verification_flow'
+PASSWORD_RESET = 'password_reset_flow'
+USERNAME_RECOVERY = 'username_recovery_flow'
+
+
+def get_flow(session, flow):
+    """Return the state dict for a flow, or an empty dict if none is pending"""
+    return session.get(flow) or {}
+
+
+def start_flow(session, flow, **state):
+    """Begin a flow, replacing any previous state for it"""
+    if session.get(flow) != state:
+        session[flow] = state
+
+
+def update_flow(session, flow, **changes):
+    """Merge changes into a pending flow's state"""
+    state = get_flow(session, flow)
+    if any(state.get(key) != value for key, value in changes.items()):
+        session[flow] = {**state, **changes}
+
+
+def clear_flow(session, flow):
+    """Forget a flow; only touches the session if the flow was pending"""
+    if flow in session:
+        del session[flow]
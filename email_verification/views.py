@@ -8,6 +8,8 @@ from django.utils import timezone
 from .models import EmailVerification
 from .forms import EmailVerificationForm, ResendCodeForm
 from .services import EmailVerificationService
+from . import session_state
+from ai_contest.ratelimit import ratelimit
 import logging
 
 User = get_user_model()
@@ -15,13 +17,14 @@ logger = logging.getLogger(__name__)
 
 def verify_email(request):
     """Email verification view"""
-    if not request.session.get('pending_verification'):
+    flow = session_state.get_flow(request.session, session_state.EMAIL_VERIFICATION)
+    if not flow:
         messages.error(request, 'No pending verification found.')
         return redirect('accounts:login')
     
-    user_id = request.session.get('pending_verification_user_id')
-    email = request.session.get('pending_verification_email')
-    verification_type = request.session.get('verification_type', 'registration')
+    user_id = flow.get('user_id')
+    email = flow.get('email')
+    verification_type = flow.get('verification_type', 'registration')
     
     if not user_id or not email:
         messages.error(request, 'Invalid verification session.')
@@ -39,10 +42,7 @@ def verify_email(request):
             
             if success:
                 # Clear session data
-                request.session.pop('pending_verification', None)
-                request.session.pop('pending_verification_user_id', None)
-                request.session.pop('pending_verification_email', None)
-                request.session.pop('verification_type', None)
+                session_state.clear_flow(request.session, session_state.EMAIL_VERIFICATION)
                 
                 # Mark user as verified if registration
                 if verification_type == 'registration':
@@ -78,15 +78,25 @@ def verify_email(request):
     
     return render(request, 'email_verification/verify_email.html', context)
 
+def pending_verification_key(request):
+    """Rate limit identity for the pending verification (user, email and type)"""
+    flow = session_state.get_flow(request.session, session_state.EMAIL_VERIFICATION)
+    if not flow:
+        return None
+    return f"{flow.get('user_id')}:{flow.get('email')}:{flow.get('verification_type', 'registration')}"
+
 @require_POST
+@ratelimit('resend_code', rate='10/10m', keys=('ip',))
+@ratelimit('resend_code', rate='3/10m', keys=(pending_verification_key,))
 def resend_verification_code(request):
     """Resend verification code"""
-    if not request.session.get('pending_verification'):
+    flow = session_state.get_flow(request.session, session_state.EMAIL_VERIFICATION)
+    if not flow:
         return JsonResponse({'success': False, 'message': 'No pending verification found.'})
     
-    user_id = request.session.get('pending_verification_user_id')
-    email = request.session.get('pending_verification_email')
-    verification_type = request.session.get('verification_type', 'registration')
+    user_id = flow.get('user_id')
+    email = flow.get('email')
+    verification_type = flow.get('verification_type', 'registration')
     
     if not user_id or not email:
         return JsonResponse({'success': False, 'message': 'Invalid verification session.'})
@@ -94,20 +104,6 @@ def resend_verification_code(request):
     try:
         user = get_object_or_404(User, id=user_id)
         
-        # Check rate limiting (max 3 codes per 10 minutes)
-        recent_codes = EmailVerification.objects.filter(
-            user=user,
-            email=email,
-            verification_type=verification_type,
-            created_at__gte=timezone.now() - timezone.timedelta(minutes=10)
-        ).count()
-        
-        if recent_codes >= 3:
-            return JsonResponse({
-                'success': False, 
-                'message': 'Too many requests. Please wait 10 minutes before requesting a new code.'
-            })
-        
         # Send new verification code
         verification = EmailVerificationService.send_verification_code(
             user, email, verification_type
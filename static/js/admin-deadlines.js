@@ -0,0 +1,92 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Initialize countdown timers
+    updateCountdowns();
+    setInterval(updateCountdowns, 1000);
+
+    // Form validation
+    const form = document.getElementById('deadlineForm');
+    form.addEventListener('submit', function(e) {
+        const startDate = new Date(document.getElementById('startDate').value);
+        const endDate = new Date(document.getElementById('endDate').value);
+
+        if (endDate <= startDate) {
+            e.preventDefault();
+            alert('End date must be after start date.');
+            return false;
+        }
+    });
+});
+
+function updateCountdowns() {
+    const countdowns = document.querySelectorAll('.countdown-timer[data-end-date]');
+
+    countdowns.forEach(function(countdown) {
+        const endDate = new Date(countdown.dataset.endDate);
+        const now = new Date();
+        const timeDiff = endDate - now;
+
+        if (timeDiff <= 0) {
+            countdown.textContent = 'Expired';
+            countdown.classList.add('text-danger');
+            return;
+        }
+
+        const days = Math.floor(timeDiff / (1000 * 60 * 60 * 24));
+        const hours = Math.floor((timeDiff % (1000 * 60 * 60 * 24)) / (1000 * 60 * 60));
+        const minutes = Math.floor((timeDiff % (1000 * 60 * 60)) / (1000 * 60));
+        const seconds = Math.floor((timeDiff % (1000 * 60)) / 1000);
+
+        let timeString = '';
+        if (days > 0) {
+            timeString += days + 'd ';
+        }
+        if (hours > 0 || days > 0) {
+            timeString += hours + 'h ';
+        }
+        if (minutes > 0 || hours > 0 || days > 0) {
+            timeString += minutes + 'm ';
+        }
+        timeString += seconds + 's';
+
+        countdown.textContent = timeString;
+
+        // Color coding based on time remaining
+        if (timeDiff < 24 * 60 * 60 * 1000) { // Less than 24 hours
+            countdown.classList.add('text-danger');
+        } else if (timeDiff < 7 * 24 * 60 * 60 * 1000) { // Less than 7 days
+            countdown.classList.add('text-warning');
+        } else {
+            countdown.classList.add('text-success');
+        }
+    });
+}
+
+document.getElementById('addDeadlineModal').addEventListener('show.bs.modal', function(event) {
+    const button = event.relatedTarget;
+    const id = button.dataset.id;
+
+    if (id) { // If id exists, it's an edit
+        document.getElementById('modalTitle').textContent = 'Edit Deadline';
+        document.getElementById('deadlineId').value = id;
+        document.getElementById('deadlineName').value = button.dataset.name;
+        document.getElementById('startDate').value = button.dataset.start;
+        document.getElementById('endDate').value = button.dataset.end;
+        document.getElementById('description').value = button.dataset.description;
+    }
+});
+
+document.getElementById('deleteModal').addEventListener('show.bs.modal', function(event) {
+    const button = event.relatedTarget;
+    const id = button.dataset.id;
+    const name = button.dataset.name;
+
+    document.getElementById('deleteDeadlineName').textContent = name;
+    document.getElementById('deleteDeadlineId').value = id;
+});
+
+// Reset form when modal is closed
+document.getElementById('addDeadlineModal').addEventListener('hidden.bs.modal', function() {
+    document.getElementById('modalTitle').textContent = 'Add New Deadline';
+    document.getElementById('deadlineForm').reset();
+    document.getElementById('deadlineId').value = '';
+});
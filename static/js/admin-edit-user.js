@@ -0,0 +1,91 @@
+function resetPassword(userId) {
+    document.getElementById('confirmModalTitle').textContent = 'Reset Password';
+    document.getElementById('confirmModalBody').innerHTML = 
+        'Are you sure you want to reset this user\'s password? They will receive an email with reset instructions.';
+
+    document.getElementById('confirmActionBtn').onclick = function() {
+        // Submit form to reset password
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.innerHTML = `
+            ${csrfInput()}
+            <input type="hidden" name="action" value="reset_password">
+            <input type="hidden" name="user_id" value="${userId}">
+        `;
+        document.body.appendChild(form);
+        form.submit();
+    };
+
+    new bootstrap.Modal(document.getElementById('confirmModal')).show();
+}
+
+function deleteAllSongs(userId) {
+    document.getElementById('confirmModalTitle').textContent = 'Delete All Songs';
+    document.getElementById('confirmModalBody').innerHTML = 
+        'Are you sure you want to delete ALL songs by this user? This action cannot be undone.';
+
+    document.getElementById('confirmActionBtn').onclick = function() {
+        // Submit form to delete all songs
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.innerHTML = `
+            ${csrfInput()}
+            <input type="hidden" name="action" value="delete_all_songs">
+            <input type="hidden" name="user_id" value="${userId}">
+        `;
+        document.body.appendChild(form);
+        form.submit();
+    };
+
+    new bootstrap.Modal(document.getElementById('confirmModal')).show();
+}
+
+function deleteUser(userId, username) {
+    document.getElementById('confirmModalTitle').textContent = 'Delete User';
+    document.getElementById('confirmModalBody').innerHTML = 
+        `Are you sure you want to permanently delete the user "<strong>${username}</strong>"? This will also delete all their songs, votes, and comments. This action cannot be undone.`;
+
+    document.getElementById('confirmActionBtn').onclick = function() {
+        // Submit form to delete user
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.innerHTML = `
+            ${csrfInput()}
+            <input type="hidden" name="action" value="delete_user">
+            <input type="hidden" name="user_id" value="${userId}">
+        `;
+        document.body.appendChild(form);
+        form.submit();
+    };
+
+    new bootstrap.Modal(document.getElementById('confirmModal')).show();
+}
+
+// Form validation
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.querySelector('form');
+    form.addEventListener('submit', function(e) {
+        const username = document.getElementById('username').value.trim();
+        const email = document.getElementById('email').value.trim();
+
+        if (!username) {
+            e.preventDefault();
+            alert('Username is required.');
+            return false;
+        }
+
+        if (!email) {
+            e.preventDefault();
+            alert('Email address is required.');
+            return false;
+        }
+
+        // Email validation
+        const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+        if (!emailRegex.test(email)) {
+            e.preventDefault();
+            alert('Please enter a valid email address.');
+            return false;
+        }
+    });
+});
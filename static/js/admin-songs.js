@@ -0,0 +1,169 @@
+let selectedSongs = new Set();
+
+document.addEventListener('DOMContentLoaded', function() {
+    const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+
+    // Select all functionality
+    const selectAllCheckbox = document.getElementById('selectAll');
+    const songCheckboxes = document.querySelectorAll('.song-checkbox');
+
+    selectAllCheckbox.addEventListener('change', function() {
+        songCheckboxes.forEach(checkbox => {
+            checkbox.checked = this.checked;
+            if (this.checked) {
+                selectedSongs.add(checkbox.value);
+            } else {
+                selectedSongs.delete(checkbox.value);
+            }
+        });
+        updateBulkActionsBar();
+    });
+
+    // Individual checkbox functionality
+    songCheckboxes.forEach(checkbox => {
+        checkbox.addEventListener('change', function() {
+            if (this.checked) {
+                selectedSongs.add(this.value);
+            } else {
+                selectedSongs.delete(this.value);
+            }
+            updateBulkActionsBar();
+
+            // Update select all checkbox
+            const checkedCount = document.querySelectorAll('.song-checkbox:checked').length;
+            selectAllCheckbox.checked = checkedCount === songCheckboxes.length;
+            selectAllCheckbox.indeterminate = checkedCount > 0 && checkedCount < songCheckboxes.length;
+        });
+    });
+
+    // Action buttons
+    document.querySelectorAll('.btn-update-status').forEach(button => {
+        button.addEventListener('click', function() {
+            updateSongStatus(this.dataset.songId, this.dataset.status);
+        });
+    });
+
+    document.querySelectorAll('.btn-toggle-feature').forEach(button => {
+        button.addEventListener('click', function() {
+            toggleFeature(this.dataset.songId, this.dataset.featured === 'true');
+        });
+    });
+
+    // Modal logic
+    const confirmModal = document.getElementById('confirmModal');
+    if (confirmModal) {
+        confirmModal.addEventListener('show.bs.modal', function(event) {
+            const button = event.relatedTarget;
+            const modalTitle = confirmModal.querySelector('.modal-title');
+            const modalBody = confirmModal.querySelector('.modal-body');
+            const confirmBtn = confirmModal.querySelector('#confirmActionBtn');
+
+            if (button.classList.contains('btn-delete-song')) {
+                const songId = button.dataset.songId;
+                const songTitle = button.dataset.songTitle;
+
+                modalTitle.textContent = 'Delete Song';
+                modalBody.innerHTML = `Are you sure you want to permanently delete the song "<strong>${songTitle}</strong>"? This action cannot be undone.`;
+
+                confirmBtn.onclick = function() {
+                    deleteSong(songId);
+                };
+            }
+        });
+    }
+});
+
+function updateBulkActionsBar() {
+    const bulkActionsBar = document.getElementById('bulkActionsBar');
+    const selectedCount = document.getElementById('selectedCount');
+
+    selectedCount.textContent = selectedSongs.size;
+
+    if (selectedSongs.size > 0) {
+        bulkActionsBar.classList.add('show');
+    } else {
+        bulkActionsBar.classList.remove('show');
+    }
+}
+
+function clearSelection() {
+    selectedSongs.clear();
+    document.querySelectorAll('.song-checkbox').forEach(checkbox => {
+        checkbox.checked = false;
+    });
+    document.getElementById('selectAll').checked = false;
+    document.getElementById('selectAll').indeterminate = false;
+    updateBulkActionsBar();
+}
+
+function updateSongStatus(songId, status) {
+    const form = document.createElement('form');
+    form.method = 'POST';
+    form.innerHTML = `
+        ${csrfInput()}
+        <input type="hidden" name="action" value="update_status">
+        <input type="hidden" name="song_id" value="${songId}">
+        <input type="hidden" name="status" value="${status}">
+    `;
+    document.body.appendChild(form);
+    form.submit();
+}
+
+function toggleFeature(songId, featured) {
+    const form = document.createElement('form');
+    form.method = 'POST';
+    form.innerHTML = `
+        ${csrfInput()}
+        <input type="hidden" name="action" value="toggle_feature">
+        <input type="hidden" name="song_id" value="${songId}">
+        <input type="hidden" name="featured" value="${featured}">
+    `;
+    document.body.appendChild(form);
+    form.submit();
+}
+
+function deleteSong(songId) {
+    const form = document.createElement('form');
+    form.method = 'POST';
+    form.innerHTML = `
+        ${csrfInput()}
+        <input type="hidden" name="action" value="delete_song">
+        <input type="hidden" name="song_id" value="${songId}">
+    `;
+    document.body.appendChild(form);
+    form.submit();
+}
+
+function bulkAction(action) {
+    if (selectedSongs.size === 0) {
+        alert('Please select at least one song.');
+        return;
+    }
+
+    let actionText = '';
+    switch(action) {
+        case 'approve': actionText = 'approve'; break;
+        case 'reject': actionText = 'reject'; break;
+        case 'pending': actionText = 'set as pending'; break;
+        case 'feature': actionText = 'feature'; break;
+        default: actionText = 'perform this action on';
+    }
+
+    document.getElementById('confirmModalTitle').textContent = 'Bulk Action';
+    document.getElementById('confirmModalBody').innerHTML = 
+        `Are you sure you want to ${actionText} ${selectedSongs.size} selected song(s)?`;
+
+    document.getElementById('confirmActionBtn').onclick = function() {
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.innerHTML = `
+            ${csrfInput()}
+            <input type="hidden" name="action" value="bulk_${action}">
+            <input type="hidden" name="song_ids" value="${Array.from(selectedSongs).join(',')}">
+        `;
+        document.body.appendChild(form);
+        form.submit();
+    };
+
+    new bootstrap.Modal(document.getElementById('confirmModal')).show();
+}
@@ -0,0 +1,157 @@
+let selectedUsers = new Set();
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Select all functionality
+    const selectAllCheckbox = document.getElementById('selectAll');
+    const userCheckboxes = document.querySelectorAll('.user-checkbox');
+
+    selectAllCheckbox.addEventListener('change', function() {
+        userCheckboxes.forEach(checkbox => {
+            checkbox.checked = this.checked;
+            if (this.checked) {
+                selectedUsers.add(checkbox.value);
+            } else {
+                selectedUsers.delete(checkbox.value);
+            }
+        });
+        updateBulkActionsBar();
+    });
+
+    // Individual checkbox functionality
+    userCheckboxes.forEach(checkbox => {
+        checkbox.addEventListener('change', function() {
+            if (this.checked) {
+                selectedUsers.add(this.value);
+            } else {
+                selectedUsers.delete(this.value);
+            }
+            updateBulkActionsBar();
+
+            // Update select all checkbox
+            const checkedCount = document.querySelectorAll('.user-checkbox:checked').length;
+            selectAllCheckbox.checked = checkedCount === userCheckboxes.length;
+            selectAllCheckbox.indeterminate = checkedCount > 0 && checkedCount < userCheckboxes.length;
+        });
+    });
+});
+
+function updateBulkActionsBar() {
+    const bulkActionsBar = document.getElementById('bulkActionsBar');
+    const selectedCount = document.getElementById('selectedCount');
+
+    selectedCount.textContent = selectedUsers.size;
+
+    if (selectedUsers.size > 0) {
+        bulkActionsBar.classList.add('show');
+    } else {
+        bulkActionsBar.classList.remove('show');
+    }
+}
+
+function clearSelection() {
+    selectedUsers.clear();
+    document.querySelectorAll('.user-checkbox').forEach(checkbox => {
+        checkbox.checked = false;
+    });
+    const selectAll = document.getElementById('selectAll');
+    if (selectAll) {
+        selectAll.checked = false;
+        selectAll.indeterminate = false;
+    }
+    updateBulkActionsBar();
+}
+
+function submitActionForm(action, data) {
+    const form = document.createElement('form');
+    form.method = 'POST';
+    let innerHTML = `${csrfInput()}<input type="hidden" name="action" value="${action}">`;
+    for (const key in data) {
+        innerHTML += `<input type="hidden" name="${key}" value="${data[key]}">`;
+    }
+    form.innerHTML = innerHTML;
+    document.body.appendChild(form);
+    form.submit();
+}
+
+// Event listeners
+document.addEventListener('click', function(e) {
+    // Single user actions
+    const target = e.target.closest('.user-action-btn');
+    if (target) {
+        const { action, userId, activate } = target.dataset;
+        if (action === 'toggle-status') {
+            submitActionForm('toggle_status', { user_id: userId, activate: activate });
+        } else if (action === 'verify-user') {
+            submitActionForm('verify_user', { user_id: userId });
+        }
+        return;
+    }
+
+    // Bulk actions
+    const bulkActionBtn = e.target.closest('#bulkActionsButtons button[data-action]');
+    if (bulkActionBtn) {
+        const action = bulkActionBtn.dataset.action;
+        if (selectedUsers.size === 0) {
+            alert('Please select at least one user.');
+            return;
+        }
+
+        const confirmModal = new bootstrap.Modal(document.getElementById('confirmModal'));
+        const confirmModalTitle = document.getElementById('confirmModalTitle');
+        const confirmModalBody = document.getElementById('confirmModalBody');
+        const confirmActionBtn = document.getElementById('confirmActionBtn');
+
+        confirmModalTitle.textContent = 'Confirm Bulk Action';
+        confirmModalBody.innerHTML = `Are you sure you want to ${action} ${selectedUsers.size} selected user(s)?`;
+
+        confirmActionBtn.onclick = () => {
+            submitActionForm(`bulk_${action}`, { user_ids: Array.from(selectedUsers).join(',') });
+        };
+        confirmModal.show();
+        return;
+    }
+
+    // Clear selection
+    if (e.target.closest('#clearSelectionBtn')) {
+        clearSelection();
+        return;
+    }
+
+    // Export buttons
+    const exportBtn = e.target.closest('#exportButtons button[data-format]');
+    if (exportBtn) {
+        const format = exportBtn.dataset.format;
+        submitActionForm('export', { format: format });
+        const exportModal = bootstrap.Modal.getInstance(document.getElementById('exportModal'));
+        if (exportModal) {
+            exportModal.hide();
+        }
+        return;
+    }
+});
+
+// Modal listener for single user deletion
+const confirmModal = document.getElementById('confirmModal');
+if (confirmModal) {
+    confirmModal.addEventListener('show.bs.modal', function (event) {
+        const button = event.relatedTarget;
+        if (!button) return;
+
+        const action = button.dataset.action;
+        if (action === 'delete-user') {
+            const userId = button.dataset.userId;
+            const username = button.dataset.username;
+
+            const modalTitle = confirmModal.querySelector('.modal-title');
+            const modalBody = confirmModal.querySelector('.modal-body');
+            const confirmActionBtn = confirmModal.querySelector('#confirmActionBtn');
+
+            modalTitle.textContent = 'Delete User';
+            modalBody.innerHTML = `Are you sure you want to permanently delete the user "<strong>${username}</strong>"? This will also delete all their songs, votes, and comments. This action cannot be undone.`;
+
+            confirmActionBtn.onclick = () => {
+                submitActionForm('delete_user', { user_id: userId });
+            };
+        }
+    });
+}
@@ -0,0 +1,104 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Prevent selecting the same song for multiple positions
+    const positionSelects = ['first_place', 'second_place', 'third_place'];
+
+    positionSelects.forEach(selectId => {
+        const select = document.getElementById(selectId);
+        if (select) {
+            select.addEventListener('change', function() {
+                updateAvailableOptions();
+            });
+        }
+    });
+
+    function updateAvailableOptions() {
+        const selectedValues = positionSelects.map(id => {
+            const select = document.getElementById(id);
+            return select ? select.value : '';
+        }).filter(value => value !== '');
+
+        positionSelects.forEach(selectId => {
+            const select = document.getElementById(selectId);
+            if (select) {
+                const currentValue = select.value;
+                const options = select.querySelectorAll('option');
+
+                options.forEach(option => {
+                    if (option.value === '') return; // Skip empty option
+
+                    if (selectedValues.includes(option.value) && option.value !== currentValue) {
+                        option.disabled = true;
+                        option.textContent = option.textContent.replace(' (Selected)', '') + ' (Selected)';
+                    } else {
+                        option.disabled = false;
+                        option.textContent = option.textContent.replace(' (Selected)', '');
+                    }
+                });
+            }
+        });
+    }
+
+    // Form validation
+    const winnerForm = document.getElementById('winnerSelectionForm');
+    if (winnerForm) {
+        winnerForm.addEventListener('submit', function(e) {
+            const firstPlace = document.getElementById('first_place').value;
+            if (!firstPlace) {
+                e.preventDefault();
+                alert('Please select at least a first place winner.');
+                return false;
+            }
+        });
+    }
+});
+
+// Modal event listeners
+const changePositionModal = document.getElementById('changePositionModal');
+if (changePositionModal) {
+    changePositionModal.addEventListener('show.bs.modal', function (event) {
+        const button = event.relatedTarget;
+        if (!button) return;
+
+        const action = button.dataset.action;
+        if (action === 'change-position') {
+            const winnerId = button.dataset.winnerId;
+            const currentPosition = button.dataset.currentPosition;
+
+            document.getElementById('changeWinnerId').value = winnerId;
+            document.getElementById('newPosition').value = currentPosition;
+        }
+    });
+}
+
+const confirmModal = document.getElementById('confirmModal');
+if (confirmModal) {
+    confirmModal.addEventListener('show.bs.modal', function (event) {
+        const button = event.relatedTarget;
+        if (!button) return;
+
+        const action = button.dataset.action;
+        if (action === 'remove-winner') {
+            const winnerId = button.dataset.winnerId;
+            const songTitle = button.dataset.songTitle;
+
+            const modalTitle = confirmModal.querySelector('.modal-title');
+            const modalBody = confirmModal.querySelector('.modal-body');
+            const confirmActionBtn = confirmModal.querySelector('#confirmActionBtn');
+
+            modalTitle.textContent = 'Remove Winner';
+            modalBody.innerHTML = `Are you sure you want to remove "<strong>${songTitle}</strong>" from the winners list?`;
+
+            confirmActionBtn.onclick = () => {
+                const form = document.createElement('form');
+                form.method = 'POST';
+                form.innerHTML = `
+                    ${csrfInput()}
+                    <input type="hidden" name="action" value="remove_winner">
+                    <input type="hidden" name="winner_id" value="${winnerId}">
+                `;
+                document.body.appendChild(form);
+                form.submit();
+            };
+        }
+    });
+}
@@ -0,0 +1,7 @@
+// Shared by the admin panel pages; each page renders
+// <meta name="csrf-token" content="{{ csrf_token }}"> in extra_css
+function csrfInput() {
+    const meta = document.querySelector('meta[name="csrf-token"]');
+    const token = meta ? meta.content : '';
+    return `<input type="hidden" name="csrfmiddlewaretoken" value="${token}">`;
+}
@@ -0,0 +1,105 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const navbar = document.getElementById('mainNavbar');
+
+    // Professional navbar scroll effect
+    window.addEventListener('scroll', function() {
+        if (window.scrollY > 50) {
+            navbar.classList.add('scrolled');
+        } else {
+            navbar.classList.remove('scrolled');
+        }
+    });
+
+    // Set active nav link based on current page
+    const currentLocation = location.pathname;
+    const navLinks = document.querySelectorAll('.nav-link');
+
+    navLinks.forEach(link => {
+        if (link.getAttribute('href') === currentLocation) {
+            link.classList.add('active');
+        }
+    });
+
+    // Smooth scroll for anchor links
+    document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+        anchor.addEventListener('click', function(e) {
+            e.preventDefault();
+            const target = document.querySelector(this.getAttribute('href'));
+            if (target) {
+                target.scrollIntoView({
+                    behavior: 'smooth',
+                    block: 'start'
+                });
+            }
+        });
+    });
+
+    // Professional card hover effects
+    const cards = document.querySelectorAll('.card');
+    cards.forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-4px)';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+
+    // Form focus enhancement
+    const formControls = document.querySelectorAll('.form-control, .form-select');
+    formControls.forEach(control => {
+        control.addEventListener('focus', function() {
+            this.parentElement.classList.add('focused');
+        });
+
+        control.addEventListener('blur', function() {
+            this.parentElement.classList.remove('focused');
+        });
+    });
+
+    // Professional page loader functionality
+    const pageLoader = document.getElementById('pageLoader');
+
+    // Hide loader after page load with 1 second delay
+    window.addEventListener('load', function() {
+        setTimeout(function() {
+            pageLoader.classList.add('hidden');
+        }, 1000);
+    });
+
+    // Show loader on page navigation
+    document.addEventListener('click', function(e) {
+        const link = e.target.closest('a');
+        if (link && 
+            link.href && 
+            !link.href.startsWith('#') && 
+            !link.href.startsWith('javascript:') &&
+            !link.href.includes('mailto:') &&
+            !link.href.includes('tel:') &&
+            !link.target &&
+            !link.hasAttribute('data-bs-toggle') &&
+            !link.classList.contains('dropdown-toggle') &&
+            !link.closest('.dropdown') &&
+            link.hostname === window.location.hostname) {
+
+            e.preventDefault();
+            pageLoader.classList.remove('hidden');
+
+            setTimeout(function() {
+                window.location.href = link.href;
+            }, );
+        }
+    });
+
+    // Show loader on form submissions
+    document.querySelectorAll('form').forEach(form => {
+        form.addEventListener('submit', function(e) {
+            // Only show loader for GET forms or forms that redirect
+            if (this.method.toLowerCase() === 'get' || 
+                this.action && !this.action.includes('#')) {
+                pageLoader.classList.remove('hidden');
+            }
+        });
+    });
+});